@@ -6,14 +6,20 @@ Track and award badges for milestones
 import json
 import os
 import logging
+import threading
 from datetime import datetime, date, timedelta
 
+from storage_utils import write_json_atomic
+
 logger = logging.getLogger(__name__)
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 ACHIEVEMENTS_FILE = os.path.join(SCRIPT_DIR, "achievements.json")
 
+# Serializes load/modify/save cycles (the bot calls these from worker threads)
+_achievements_lock = threading.RLock()
+
 def _fix_storage_file(file_path):
     """Fix storage file if it's a directory (Docker volume mount issue)"""
     if os.path.exists(file_path) and os.path.isdir(file_path):
@@ -84,31 +90,32 @@ ACHIEVEMENTS = {
 
 def load_achievements():
     """Load user achievements"""
-    if not _fix_storage_file(ACHIEVEMENTS_FILE):
-        return {}
-    
-    if not os.path.exists(ACHIEVEMENTS_FILE):
-        return {}
-    
-    try:
-        with open(ACHIEVEMENTS_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading achievements: {e}")
-        return {}
+    with _achievements_lock:
+        if not _fix_storage_file(ACHIEVEMENTS_FILE):
+            return {}
+        
+        if not os.path.exists(ACHIEVEMENTS_FILE):
+            return {}
+        
+        try:
+            with open(ACHIEVEMENTS_FILE, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading achievements: {e}")
+            return {}
 
 def save_achievements(achievements):
     """Save user achievements"""
-    if not _fix_storage_file(ACHIEVEMENTS_FILE):
-        return False
-    
-    try:
-        with open(ACHIEVEMENTS_FILE, 'w') as f:
-            json.dump(achievements, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving achievements: {e}")
-        return False
+    with _achievements_lock:
+        if not _fix_storage_file(ACHIEVEMENTS_FILE):
+            return False
+        
+        try:
+            write_json_atomic(ACHIEVEMENTS_FILE, achievements, indent=2)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving achievements: {e}")
+            return False
 
 def get_user_achievements(user_id):
     """Get user's unlocked achievements"""
@@ -122,22 +129,23 @@ def get_user_achievements(user_id):
 
 def unlock_achievement(user_id, achievement_id):
     """Unlock an achievement for a user"""
-    achievements = load_achievements()
-    user_id_str = str(user_id)
-    
-    if user_id_str not in achievements:
-        achievements[user_id_str] = {
-            'unlocked': [],
-            'unlocked_at': {}
-        }
-    
-    if achievement_id not in achievements[user_id_str]['unlocked']:
-        achievements[user_id_str]['unlocked'].append(achievement_id)
-        achievements[user_id_str]['unlocked_at'][achievement_id] = datetime.now().isoformat()
-        save_achievements(achievements)
-        return True
-    
-    return False  # Already unlocked
+    with _achievements_lock:
+        achievements = load_achievements()
+        user_id_str = str(user_id)
+        
+        if user_id_str not in achievements:
+            achievements[user_id_str] = {
+                'unlocked': [],
+                'unlocked_at': {}
+            }
+        
+        if achievement_id not in achievements[user_id_str]['unlocked']:
+            achievements[user_id_str]['unlocked'].append(achievement_id)
+            achievements[user_id_str]['unlocked_at'][achievement_id] = datetime.now().isoformat()
+            save_achievements(achievements)
+            return True
+        
+        return False  # Already unlocked
 
 def check_and_award_achievements(user_id, reading_progress=None, quiz_stats=None, daily_quiz_stats=None):
     """Check if user qualifies for any achievements and award them"""
@@ -3,6 +3,8 @@ Bible Q&A Database
 Common questions with answers and Bible references
 """
 
+import functools
+
 BIBLE_QA = [
     {
         "keywords": ["love", "god loves", "god's love", "loved", "loving"],
@@ -211,8 +213,12 @@ def find_answer(user_question):
     Find the best matching answer for a user's question
     Returns the best match or None if no good match found
     """
-    user_question_lower = user_question.lower()
-    
+    # Matching is case-insensitive, so repeat questions share one cache entry
+    return _find_answer_lower(user_question.lower().strip())
+
+@functools.lru_cache(maxsize=2048)
+def _find_answer_lower(user_question_lower):
+    """Best matching Q&A entry for an already lowercased question (None if no keyword matches)"""
     # Score each Q&A entry based on keyword matches
     best_match = None
     best_score = 0
@@ -7,30 +7,38 @@ Handles user interactions, queries, and daily message subscriptions
 import os
 import logging
 import asyncio
+import calendar
 import re
 import html
+import time
+import functools
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
-from telegram.ext import Application, CommandHandler, MessageHandler, filters, ContextTypes, CallbackQueryHandler
-from telegram.error import TelegramError, Forbidden, BadRequest
+from telegram.ext import Application, MessageHandler, filters, ContextTypes, CallbackQueryHandler
+from telegram.error import TelegramError, Forbidden, BadRequest, RetryAfter
 from dotenv import load_dotenv
 from reading_plan import get_reading_for_day, READING_PLANS
-from user_storage import add_user, is_subscribed, get_all_subscribed_users, remove_user
+from user_storage import (
+    ensure_user, get_all_subscribed_users, get_subscribed_users_mtime, remove_user, remove_users
+)
 from bible_books import expand_bible_reading, BIBLE_BOOK_ABBREVIATIONS
 from quiz_questions import (
-    get_random_question, get_total_questions, get_stats,
+    get_random_question, get_question_index, get_total_questions, get_stats,
     CATEGORIES, DIFFICULTIES
 )
 from bible_qa import find_answer, get_all_topics
 from quiz_storage import (
     get_user_score, update_user_score, start_quiz_session,
-    get_quiz_session, update_quiz_session, end_quiz_session,
-    load_active_quizzes, save_active_quizzes, get_leaderboard,
-    get_user_rank, update_user_info, save_quiz_to_history, get_quiz_history
+    get_quiz_session, end_quiz_session,
+    load_active_quizzes, save_active_quizzes,
+    get_user_rank, get_leaderboard_and_rank, update_user_info, save_quiz_to_history, get_quiz_history,
+    enable_write_behind, flush_active_quizzes
 )
 from reading_progress import (
-    mark_day_completed, get_user_progress, get_current_streak,
-    get_longest_streak, is_day_completed
+    mark_day_completed, get_user_progress,
+    is_day_completed, get_user_dashboard
 )
 from daily_quiz import (
     get_today_quiz_question, mark_daily_quiz_completed,
@@ -48,64 +56,685 @@ from reminders import (
     get_user_reminders, parse_time_string
 )
 from config import (
-    MAX_RECENT_QUESTIONS, DAYS_IN_YEAR, DAYS_IN_LEAP_YEAR,
+    MAX_RECENT_QUESTIONS, MAX_IN_MEMORY_QUIZZES, MAX_STORED_USER_NAMES, DAYS_IN_YEAR, DAYS_IN_LEAP_YEAR,
     PROGRESS_BAR_LENGTH, LEADERBOARD_TOP_N, ENCOURAGEMENT_MESSAGES,
-    MESSAGE_SEPARATOR, ERROR_MESSAGE_GENERIC, ERROR_MESSAGE_QUIZ_ACTIVE,
-    ERROR_MESSAGE_INVALID_DAY, TOTAL_QUIZ_QUESTIONS
+    MESSAGE_SEPARATOR, ERROR_MESSAGE_GENERIC,
+    ERROR_MESSAGE_INVALID_DAY, TOTAL_QUIZ_QUESTIONS, QUIZ_SESSION_FLUSH_INTERVAL,
+    DAILY_BROADCAST_CONCURRENCY, DAILY_BROADCAST_SLOT_DELAY
 )
 
-# Load environment variables
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+def _init_env():
+    """Load environment variables and configure logging (entry points only, not on import)"""
+    load_dotenv()
+    logging.basicConfig(
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        level=logging.INFO
+    )
+
+def install_uvloop():
+    """Use uvloop's event loop for everything started after this call, if it is installed"""
+    try:
+        import uvloop
+    except ImportError:
+        logger.info("uvloop not installed, using the default asyncio event loop")
+        return False
+    uvloop.install()
+    return True
+
+# Per-second cache of (epoch_second, day_of_year, date_str, year) so hot handlers
+# don't call datetime.now() and strftime on every invocation
+_DOY_CACHE = (0, 0, "", 0)
+
+_ENCOURAGEMENTS_LEN = len(ENCOURAGEMENT_MESSAGES)
+
+# Static footers appended to command replies (Markdown parse mode)
+_SCORE_FOOTER = """
+
+*Quiz Options:*
+• /quiz - Random question
+• /quiz_easy - Easy questions only
+• /quiz_medium - Medium difficulty only
+• /quiz_hard - Hard questions only
+• /quiz old_testament - Old Testament
+• /quiz new_testament - New Testament
+• /quiz bible_facts - Bible Facts
 
-# Configure logging
-logging.basicConfig(
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    level=logging.INFO
+*Leaderboard:*
+• /leaderboard - See top players
+
+Keep learning! Use /quiz to take another quiz."""
+
+_LEADERBOARD_FOOTER = (
+    "\n*Commands:*\n"
+    "• /quiz_easy - Easy questions\n"
+    "• /quiz_medium - Medium questions\n"
+    "• /quiz_hard - Hard questions\n"
+    "• /score - Your stats"
 )
-logger = logging.getLogger(__name__)
+
+_PROGRESS_FOOTER = """
+
+💡 *Tip:* Use /today to read today's passage and automatically mark it as completed!
+
+*Commands:*
+• /streak - View your reading streak
+• /stats - Detailed statistics
+• /completed [day] - Mark a specific day as completed"""
+
+_STREAK_FOOTER = """
+        
+💪 *Keep it up!* Consistency is key to completing the Bible in a Year.
+
+*Commands:*
+• /progress - Full progress overview
+• /stats - Detailed statistics
+• /today - Read today's passage"""
+
+_STATS_FOOTER = """
+
+💡 *Tips:*
+• Read every day to maintain your streak!
+• Use /today to automatically mark today as completed
+• Use /progress for a visual progress bar
+
+*Commands:*
+• /progress - Visual progress overview
+• /streak - Streak information
+• /completed [day] - Mark a day as completed"""
+
+# Static tails of the menu_streak / menu_stats callback screens
+_STREAK_MENU_FOOTER = """
+        
+💪 *Keep it up!* Consistency is key."""
+
+_STATS_MENU_FOOTER = f"""
+
+{MESSAGE_SEPARATOR}
+
+💡 *Tips:*
+• Read every day to maintain your streak!
+• Use /today to automatically mark today as completed"""
+
+# Every possible progress bar, indexed by the number of filled cells
+_PROGRESS_BARS = tuple(
+    "█" * filled + "░" * (PROGRESS_BAR_LENGTH - filled) for filled in range(PROGRESS_BAR_LENGTH + 1)
+)
+
+# Rank labels for leaderboard rows (medals for the top three)
+_RANK_LABELS = ("🥇", "🥈", "🥉") + tuple(f"{rank}." for rank in range(4, LEADERBOARD_TOP_N + 1))
+
+# Question info lines, precomputed for the fixed difficulty and category sets
+_DIFFICULTY_TITLES = {diff: diff.title() for diff in DIFFICULTIES}
+_DIFFICULTY_LINES = {diff: f"Difficulty: {title}\n" for diff, title in _DIFFICULTY_TITLES.items()}
+_CATEGORY_LINES = {cat_key: f"Category: {cat_name}\n" for cat_key, cat_name in CATEGORIES.items()}
+
+# (category_key, {key, lowercased display name}) accepted as /quiz arguments
+_CATEGORY_ARG_NAMES = tuple(
+    (cat_key, frozenset((cat_key, cat_name.lower()))) for cat_key, cat_name in CATEGORIES.items()
+)
+
+# Patterns matched against free-text messages in handle_query
+_DAY_RE = re.compile(r'\bday\s+(\d+)\b')
+_DAILY_CHALLENGE_DATE_RES = tuple(re.compile(pattern) for pattern in (
+    r'daily\s+challenge.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # date format
+    r'challenge.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # challenge with date
+    r'daily.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # daily with date
+    r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}).*?challenge',  # date then challenge
+    r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}).*?daily',  # date then daily
+))
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+# Characters rejected in search terms (basic sanitization)
+_SEARCH_FORBIDDEN_CHARS = frozenset('<>{}[]`')
+# Whole words only, so e.g. "nowhere" or "known" don't count as asking for today
+_TODAY_RE = re.compile(r"\b(?:today'?s?|current|now)\b")
+
+# Reply when a user tries to start a quiz while one is active (Markdown parse mode)
+_ACTIVE_QUIZ_TEMPLATE = """🎯 *You already have an active quiz!*
+
+Current score: {score}/{total}
+
+{hint}"""
+_ACTIVE_QUIZ_HINT_ANSWER = "Answer the current question or use /quiz_stop to start a new quiz."
+_ACTIVE_QUIZ_HINT_FINISH = "Complete or stop your current quiz first."
+
+# Message shown when a quiz starts; info holds optional difficulty/category lines (HTML parse mode)
+_QUIZ_STARTED_TEMPLATE = """🎯 <b>{title}</b>
+
+{info}<b>Question:</b>
+{question}
+
+<b>Tap your answer below:</b>"""
+
+# /help text (Markdown parse mode)
+_HELP_TEXT = """📖 *Bible in a Year Bot - Help*
+
+*🎯 Main Features:*
+Everything is button-based! Just tap the buttons below to interact.
+
+*📚 Reading Commands:*
+/today - Get today's Bible reading
+/day [number] - Get reading for a specific day (1-365)
+/search [book] - Search for a Bible book in the reading plan
+
+*🎯 Quiz Commands:*
+/quiz - Start a random Bible quiz
+/quiz_easy - Start an easy quiz
+/quiz_medium - Start a medium quiz
+/quiz_hard - Start a hard quiz
+/daily_quiz or /challenge - Take today's special daily challenge quiz
+/score - View your quiz statistics and rank
+/leaderboard - See top 10 players
+/quiz_stop - Stop your current quiz session
+
+*⭐ New Features:*
+/daily_quiz - Take today's special quiz challenge (one per day)
+/verse - Get today's inspiring Bible verse
+/verse [reference] - Get a specific verse (e.g., /verse John 3:16)
+/achievements or /badges - View your unlocked achievements
+/remind [time] - Set reading reminders (e.g., /remind 8am)
+/remind_off - Disable reading reminders
+
+*❓ Q&A Commands:*
+/ask [question] - Ask a Bible question and get an answer
+/question [question] - Same as /ask
+
+*📊 Reading Progress:*
+/progress - View your reading progress
+/streak - See your current reading streak
+/stats - Detailed reading statistics
+/completed [day] - Mark a specific day as completed
+
+*📊 Quiz Features:*
+• 280+ questions covering all 66 books of the Bible
+• Difficulty levels: Easy, Medium, Hard
+• Daily Challenge Quiz - one special quiz per day
+• Leaderboard rankings based on best scores
+• Achievement badges for milestones
+
+*🏆 Achievements:*
+Unlock badges by:
+• Completing readings
+• Maintaining streaks
+• Answering quiz questions
+• Completing daily challenges
+
+*📬 Daily Messages:*
+You'll automatically receive a message every day at 4:00 AM GMT with that day's reading.
+
+*About:*
+This bot follows a complete Bible in a Year reading plan, combining Old Testament and New Testament readings each day."""
+
+# /menu text; only the quick stats are filled in per user
+_MENU_TEMPLATE = f"""📱 *Main Menu*
+
+👋 Welcome! Choose an option below:
+
+📊 *Quick Stats:*
+• Reading: {{completed}} days completed
+• Streak: {{streak}} days 🔥
+• Quiz Score: {{correct}} correct answers
+
+{MESSAGE_SEPARATOR}
+*Tap a button to get started!* 👇"""
+
+# Static menu screens shown by handle_callback (Markdown parse mode)
+_MAIN_MENU_TEXT = "📱 *Main Menu*\n\nChoose an option:"
+
+_QUIZ_MENU_TEXT = f"""🎯 *Bible Quiz*
+
+Choose your difficulty level:
+• 🟢 Easy - Beginner questions
+• 🟡 Medium - Intermediate questions
+• 🔴 Hard - Advanced questions
+• 🎲 Random - Mixed difficulty
+
+*{TOTAL_QUIZ_QUESTIONS}+ questions covering all 66 books of the Bible!*"""
+
+_HELP_MENU_TEXT = f"""📖 *Bible in a Year Bot - Help*
+
+{MESSAGE_SEPARATOR}
+
+*🎯 Main Features:*
+Everything is button-based! Just tap the buttons to interact.
+
+*📚 Reading:*
+• /today - Get today's Bible reading
+• /day [number] - Get reading for a specific day
+• /search [book] - Search for a Bible book
+
+*🎯 Quiz:*
+• /quiz - Start a random Bible quiz
+• /daily_quiz - Take today's special challenge
+• /score - View your statistics
+• /leaderboard - See top players
+
+*⭐ New Features:*
+• /verse - Get verse of the day
+• /achievements - View your badges
+• /remind [time] - Set reading reminders
+
+{MESSAGE_SEPARATOR}
+
+*Use the buttons below to navigate!*"""
+
+_SEARCH_MENU_TEXT = f"""📚 *Search Reading Plan*
+
+{MESSAGE_SEPARATOR}
+
+Type the name of a Bible book to find which days include it.
+
+*Examples:*
+• Genesis
+• Matthew
+• Psalms
+
+{MESSAGE_SEPARATOR}
+
+*Type a book name or use /search [book]*"""
+
+_NO_SCORE_MENU_TEXT = f"""📊 *Your Quiz Score*
+
+{MESSAGE_SEPARATOR}
+
+You haven't answered any questions yet!
+
+*Start a quiz to begin earning points:*
+• Tap '🎯 Start Quiz' to begin
+• Complete daily challenges
+• Climb the leaderboard!"""
+
+# menu_reminders screens; the reminder times go between header and footer
+_REMINDERS_HEADER = f"""⏰ *Your Reading Reminders*
+
+{MESSAGE_SEPARATOR}
+
+*Reminder Times:*
+"""
+
+_REMINDERS_FOOTER = f"""
+
+{MESSAGE_SEPARATOR}
+
+*To add a reminder:*
+/remind 8am
+/remind 14:30
+/remind 9:00pm
+
+*To remove a reminder:*
+/remind_off"""
+
+_NO_REMINDERS_TEXT = f"""⏰ *Reading Reminders*
+
+{MESSAGE_SEPARATOR}
+
+You don't have any reminders set.
+
+*Set a reminder:*
+/remind 8am
+/remind 14:30
+/remind 9:00pm
+
+*Examples:*
+• /remind 8am - Remind at 8:00 AM
+• /remind 14:30 - Remind at 2:30 PM
+• /remind 9:00pm - Remind at 9:00 PM"""
+
+def _reminders_text(reminders):
+    """Reminders screen for /remind and the reminders menu (Markdown parse mode)"""
+    if reminders['enabled'] and reminders['times']:
+        times_list = "\n".join(f"• {reminder_time}" for reminder_time in reminders['times'])
+        return _REMINDERS_HEADER + times_list + _REMINDERS_FOOTER
+    return _NO_REMINDERS_TEXT
+
+# Buttons shared by many keyboards, created once
+_MAIN_MENU_BUTTON = InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")
+_STOP_QUIZ_BUTTON = InlineKeyboardButton("⏹️ Stop Quiz", callback_data="quiz_stop")
+
+# Callbacks that only show one of the constant screens above; they need no per-user
+# state, so handle_callback skips the subscription check for them (the buttons come
+# from messages sent after /start or /menu, which already subscribed the user)
+_STATIC_CALLBACKS = frozenset(("menu_main", "menu_quiz", "menu_help", "menu_search"))
+
+# Daily reading message templates (Markdown parse mode), filled in by _day_message and format_message
+_DAILY_TEMPLATE_WITH_ENC = """📖 *Bible in a Year - Day {day}*
+
+📅 *Date:* {date}
+🔢 *Day {day} of 365*
+
+📚 *Today's Reading:*
+{reading}
+
+💝 *Encouragement:*
+{enc}
+
+#BibleInAYear #Day{day}"""
+
+_DAILY_TEMPLATE_NO_ENC = """📖 *Bible in a Year - Day {day}*
+
+📅 *Date:* {date}
+🔢 *Day {day} of 365*
+
+📚 *Reading:*
+{reading}
+
+#BibleInAYear #Day{day}"""
+
+def _get_day_cache():
+    """Return the cached (epoch_second, day_of_year, date_str, year) tuple, refreshing it once per second"""
+    global _DOY_CACHE
+    sec = int(time.time())
+    if sec != _DOY_CACHE[0]:
+        today = datetime.now()
+        _DOY_CACHE = (sec, today.timetuple().tm_yday, today.strftime("%B %d, %Y"), today.year)
+    return _DOY_CACHE
+
+@functools.lru_cache(maxsize=400)
+def _cached_reading(day_number, year):
+    """Reading for a day with abbreviations expanded to full book names (None if not in the plan)"""
+    reading = get_reading_for_day(day_number, year)
+    return expand_bible_reading(reading) if reading else None
+
+@functools.lru_cache(maxsize=400)
+def _day_message(day_number, year):
+    """Full reading message for a day of the given year, formatted once per (day, year)"""
+    reading = _cached_reading(day_number, year)
+    if not reading:
+        logger.warning(f"No reading found for day {day_number}")
+        reading = "Reading not available for this day"
+    return _DAILY_TEMPLATE_WITH_ENC.format(
+        day=day_number,
+        date=_date_strings(year)[day_number - 1],
+        reading=reading,
+        enc=ENCOURAGEMENT_MESSAGES[(day_number - 1) % _ENCOURAGEMENTS_LEN]
+    )
+
+@functools.lru_cache(maxsize=4)
+def _days_in_year(year):
+    """Number of days in a year (DAYS_IN_LEAP_YEAR for leap years)"""
+    return DAYS_IN_LEAP_YEAR if calendar.isleap(year) else DAYS_IN_YEAR
+
+@functools.lru_cache(maxsize=2)
+def _date_strings(year):
+    """Display dates ("%B %d, %Y") for days 1-366 of a year, indexed by day_number - 1"""
+    start_date = datetime(year, 1, 1)
+    return tuple((start_date + timedelta(days=i)).strftime("%B %d, %Y") for i in range(366))
+
+@functools.lru_cache(maxsize=1)
+def _stats_info():
+    """Quiz database summary shown by /score (the question database is static)"""
+    stats = get_stats()
+    return f"""📚 *Quiz Database:*
+• Total Questions: {stats['total']}
+• Easy: {stats['by_difficulty']['easy']}
+• Medium: {stats['by_difficulty']['medium']}
+• Hard: {stats['by_difficulty']['hard']}
+
+*Categories:*
+• Old Testament: {stats['by_category']['old_testament']}
+• New Testament: {stats['by_category']['new_testament']}
+• Bible Facts: {stats['by_category']['bible_facts']}"""
+
+@functools.lru_cache(maxsize=1)
+def _no_score_message():
+    """/score reply for users who haven't answered any questions yet"""
+    return (
+        "📊 *Your Quiz Score*\n\n"
+        "You haven't taken any quizzes yet!\n\n"
+        f"{_stats_info()}\n\n"
+        "Use /quiz to start your first Bible quiz! 🎯\n\n"
+        "*Try:*\n"
+        "• /quiz easy - Easy questions\n"
+        "• /quiz medium - Medium difficulty\n"
+        "• /quiz hard - Hard questions\n"
+        "• /quiz old_testament - OT questions\n"
+        "• /quiz new_testament - NT questions"
+    )
+
+@functools.lru_cache(maxsize=4)
+def _topics_list(limit):
+    """Bulleted list of the first `limit` Q&A topics"""
+    return "\n".join(f"• {topic}" for topic in get_all_topics()[:limit])
+
+@functools.lru_cache(maxsize=1)
+def _ask_menu_text():
+    """menu_ask screen (the Q&A topics are static)"""
+    return f"""❓ *Ask a Bible Question*
+
+{MESSAGE_SEPARATOR}
+
+Type your question or use these common questions:
+
+*Examples:*
+• How can I be saved?
+• What does the Bible say about love?
+• How should I pray?
+
+{MESSAGE_SEPARATOR}
+
+*Topics I can help with:*
+{_topics_list(10)}
+... and more!
+
+{MESSAGE_SEPARATOR}
+
+*Type your question or use /ask [question]*"""
+
+@functools.lru_cache(maxsize=1024)
+def _answer_keyboard(options):
+    """Answer keyboard for a question's options (markups are immutable, so one per question is shared)"""
+    keyboard = [
+        [InlineKeyboardButton(f"{i+1}. {option}", callback_data=f"quiz_answer_{i}")]
+        for i, option in enumerate(options)
+    ]
+    keyboard.append([_STOP_QUIZ_BUTTON])
+    return InlineKeyboardMarkup(keyboard)
+
+def _achievement_lines(achievement_ids):
+    """One "emoji name" line per unlocked achievement"""
+    return "".join(
+        f"{ACHIEVEMENTS[achievement_id]['emoji']} {ACHIEVEMENTS[achievement_id]['name']}\n"
+        for achievement_id in achievement_ids
+    )
+
+def _build_search_index():
+    """
+    Build the /search index once at import time
+    Returns: {year: {abbrev: [(day_num, expanded_reading), ...]}} with days in plan order
+    """
+    index = {}
+    for year, plan in READING_PLANS.items():
+        # Lowercase for matching and expand abbreviations for display, once per day
+        plan_lower = [
+            (day_num, expand_bible_reading(reading), reading.lower())
+            for day_num, reading in plan.items()
+        ]
+        year_index = {}
+        for abbrev, full_name in BIBLE_BOOK_ABBREVIATIONS.items():
+            abbrev_lower = abbrev.lower()
+            full_name_lower = full_name.lower()
+            year_index[abbrev] = [
+                (day_num, expanded) for day_num, expanded, reading_lower in plan_lower
+                if abbrev_lower in reading_lower or full_name_lower in reading_lower
+            ]
+        index[year] = year_index
+    return index
+
+_SEARCH_INDEX = _build_search_index()
+
+# (abbrev, full_name, abbrev without periods, full_name) lowercased once for /search matching
+_SEARCH_BOOK_KEYS = tuple(
+    (abbrev, full_name, abbrev.lower().replace('.', ''), full_name.lower())
+    for abbrev, full_name in BIBLE_BOOK_ABBREVIATIONS.items()
+)
+
+@functools.lru_cache(maxsize=256)
+def _search_plan(search_term, year):
+    """
+    /search lookup for a lowercased term (the plan is static, so results are cached per term)
+    Returns: (matching book full names, ((day_num, expanded_reading), ...) sorted by day)
+    """
+    year_index = _SEARCH_INDEX.get(year, _SEARCH_INDEX[max(_SEARCH_INDEX.keys())])
+    
+    # Find matching books (both full names and abbreviations)
+    matching_books = [
+        (abbrev, full_name)
+        for abbrev, full_name, abbrev_clean, full_name_lower in _SEARCH_BOOK_KEYS
+        if search_term in full_name_lower or search_term in abbrev_clean or abbrev_clean in search_term
+    ]
+    
+    # Union the precomputed day lists for these books
+    found = {}
+    for abbrev, _ in matching_books:
+        for day_num, expanded_reading in year_index.get(abbrev, ()):
+            found[day_num] = expanded_reading
+    return tuple(full_name for _, full_name in matching_books), tuple(sorted(found.items()))
+
+@dataclass(slots=True)
+class QuizSession:
+    """In-memory quiz session (fixed-shape record, mirrors the stored session dict)"""
+    question_data: dict
+    difficulty: str | None = None
+    category: str | None = None
+    question_index: int = 0
+    score: int = 0
+    total: int = 0
+    started_at: str | None = None
+    is_daily_quiz: bool = False
+    
+    def to_dict(self):
+        """Return the session in the dict shape used by quiz_storage"""
+        return {
+            'question_index': self.question_index,
+            'question_data': self.question_data,
+            'score': self.score,
+            'total': self.total,
+            'started_at': self.started_at,
+            'difficulty': self.difficulty,
+            'category': self.category,
+            'is_daily_quiz': self.is_daily_quiz
+        }
 
 class BibleVerseBot:
     def __init__(self, token):
         self.token = token
-        self.application = Application.builder().token(token).build()
+        self.application = (
+            Application.builder()
+            .token(token)
+            .post_init(self._post_init)
+            .post_shutdown(self._post_shutdown)
+            .build()
+        )
+        # Background task that flushes buffered quiz session writes (started in _post_init)
+        self._persist_task = None
         self._setup_handlers()
         # In-memory fallback for quiz sessions if file storage fails
-        self._in_memory_quizzes = {}
+        # (bounded: oldest sessions are evicted first; storage stays authoritative)
+        self._in_memory_quizzes: OrderedDict[int, QuizSession] = OrderedDict()
         # Track recently asked questions per user to avoid repeats
-        self._recent_questions = {}  # {user_id: [question_indices]}
+        # (bounded deques: appending past MAX_RECENT_QUESTIONS drops the oldest index)
+        self._recent_questions: dict[int, deque[int]] = {}  # {user_id: deque(question_indices)}
+        # (username, first_name) last written to the quiz scores per user, so unchanged
+        # names aren't rewritten on every answer (bounded: least recently seen users evicted first)
+        self._stored_user_names: OrderedDict[int, tuple] = OrderedDict()
+        # User IDs known to be subscribed, so repeat users skip the storage round-trip.
+        # Reloaded whenever the subscriptions file changes, since the daily sender runs in
+        # another process and removes blocked users from it
+        self._subscribed_cache: set[int] = set()
+        self._subscribed_mtime = None
+        # Users found to have blocked the bot during a broadcast, removed in one write afterwards
+        self._pending_removals: set[int] = set()
+        # (user_id, callback_data) pairs currently being handled, to drop rapid repeat clicks
+        self._inflight_callbacks: set[tuple[int, str]] = set()
+        # Static keyboards are built once and reused (the markups are never mutated)
+        self._main_menu_keyboard = self._build_main_menu_keyboard()
+        self._quiz_menu_keyboard = self._build_quiz_menu_keyboard()
+        self._reading_menu_keyboard = self._build_reading_menu_keyboard()
+        self._quick_actions_keyboard = self._build_quick_actions_keyboard()
+        self._back_to_menu_keyboard = self._build_column_keyboard()
+        self._verse_keyboard = self._build_column_keyboard(("📖 New Verse", "menu_verse"))
+        self._progress_navigation_keyboard = self._build_column_keyboard(
+            ("📊 Progress", "menu_progress"), ("🔥 Streak", "menu_streak")
+        )
+        self._progress_screen_keyboard = self._build_column_keyboard(
+            ("🔥 View Streak", "menu_streak"), ("📈 Detailed Stats", "menu_stats")
+        )
+        self._streak_screen_keyboard = self._build_column_keyboard(
+            ("📊 View Progress", "menu_progress"), ("📖 Read Today", "menu_today")
+        )
+        self._leaderboard_screen_keyboard = self._build_column_keyboard(("📊 My Score", "menu_score"))
+        self._score_screen_keyboard = self._build_column_keyboard(
+            ("🎯 Start Quiz", "menu_quiz"), ("📈 Leaderboard", "menu_leaderboard")
+        )
+        self._quiz_ended_keyboard = self._build_column_keyboard(
+            ("🎯 Start Quiz", "menu_quiz"), ("📊 My Score", "menu_score")
+        )
+        self._daily_done_keyboard = self._build_column_keyboard(("⭐ New Challenge", "menu_daily_quiz"))
         
     def _setup_handlers(self):
         """Set up all command and message handlers"""
-        # Command handlers
-        self.application.add_handler(CommandHandler("start", self.start_command))
-        self.application.add_handler(CommandHandler("help", self.help_command))
-        self.application.add_handler(CommandHandler("today", self.today_command))
-        self.application.add_handler(CommandHandler("day", self.day_command))
-        self.application.add_handler(CommandHandler("search", self.search_command))
-        self.application.add_handler(CommandHandler("quiz", self.quiz_command))
-        self.application.add_handler(CommandHandler("quiz_start", self.quiz_command))
-        self.application.add_handler(CommandHandler("quiz_easy", self.quiz_easy_command))
-        self.application.add_handler(CommandHandler("quiz_medium", self.quiz_medium_command))
-        self.application.add_handler(CommandHandler("quiz_hard", self.quiz_hard_command))
-        self.application.add_handler(CommandHandler("score", self.score_command))
-        self.application.add_handler(CommandHandler("leaderboard", self.leaderboard_command))
-        self.application.add_handler(CommandHandler("rankings", self.leaderboard_command))
-        self.application.add_handler(CommandHandler("quiz_stop", self.quiz_stop_command))
-        self.application.add_handler(CommandHandler("ask", self.ask_command))
-        self.application.add_handler(CommandHandler("question", self.ask_command))
-        self.application.add_handler(CommandHandler("test_daily", self.test_daily_command))
-        self.application.add_handler(CommandHandler("progress", self.progress_command))
-        self.application.add_handler(CommandHandler("streak", self.streak_command))
-        self.application.add_handler(CommandHandler("completed", self.completed_command))
-        self.application.add_handler(CommandHandler("stats", self.stats_command))
-        self.application.add_handler(CommandHandler("menu", self.menu_command))
-        self.application.add_handler(CommandHandler("daily_quiz", self.daily_quiz_command))
-        self.application.add_handler(CommandHandler("challenge", self.daily_quiz_command))
-        self.application.add_handler(CommandHandler("verse", self.verse_command))
-        self.application.add_handler(CommandHandler("achievements", self.achievements_command))
-        self.application.add_handler(CommandHandler("badges", self.achievements_command))
-        self.application.add_handler(CommandHandler("remind", self.remind_command))
-        self.application.add_handler(CommandHandler("remind_off", self.remind_off_command))
+        # Command dispatch table - a single MessageHandler routes every /command
+        # with one dict lookup instead of checking one CommandHandler per command
+        self._cmd_table = {
+            "start": self.start_command,
+            "help": self.help_command,
+            "today": self.today_command,
+            "day": self.day_command,
+            "search": self.search_command,
+            "quiz": self.quiz_command,
+            "quiz_start": self.quiz_command,
+            "quiz_easy": self.quiz_easy_command,
+            "quiz_medium": self.quiz_medium_command,
+            "quiz_hard": self.quiz_hard_command,
+            "score": self.score_command,
+            "leaderboard": self.leaderboard_command,
+            "rankings": self.leaderboard_command,
+            "quiz_stop": self.quiz_stop_command,
+            "ask": self.ask_command,
+            "question": self.ask_command,
+            "test_daily": self.test_daily_command,
+            "progress": self.progress_command,
+            "streak": self.streak_command,
+            "completed": self.completed_command,
+            "stats": self.stats_command,
+            "menu": self.menu_command,
+            "daily_quiz": self.daily_quiz_command,
+            "challenge": self.daily_quiz_command,
+            "verse": self.verse_command,
+            "achievements": self.achievements_command,
+            "badges": self.achievements_command,
+            "remind": self.remind_command,
+            "remind_off": self.remind_off_command,
+        }
+        self.application.add_handler(MessageHandler(filters.COMMAND, self._dispatch_command))
+        
+        # Callback dispatch table - inline buttons with fixed callback_data resolve to
+        # their handler in one dict lookup (quiz answers are matched by prefix)
+        self._callback_table = {
+            "menu_main": self._cb_menu_main,
+            "menu_today": self._cb_menu_today,
+            "menu_progress": self._cb_menu_progress,
+            "menu_streak": self._cb_menu_streak,
+            "menu_quiz": self._cb_menu_quiz,
+            "menu_help": self._cb_menu_help,
+            "menu_daily_quiz": self._cb_menu_daily_quiz,
+            "menu_verse": self._cb_menu_verse,
+            "menu_achievements": self._cb_menu_achievements,
+            "menu_reminders": self._cb_menu_reminders,
+            "menu_leaderboard": self._cb_menu_leaderboard,
+            "menu_score": self._cb_menu_score,
+            "menu_stats": self._cb_menu_stats,
+            "menu_ask": self._cb_menu_ask,
+            "menu_search": self._cb_menu_search,
+            "quiz_easy": functools.partial(self._cb_start_quiz, "easy"),
+            "quiz_medium": functools.partial(self._cb_start_quiz, "medium"),
+            "quiz_hard": functools.partial(self._cb_start_quiz, "hard"),
+            "quiz_random": functools.partial(self._cb_start_quiz, None),
+            "quiz_stop": self._cb_quiz_stop,
+            "reading_today": self._cb_reading_today,
+            "reading_pick": self._cb_reading_pick,
+        }
         
         # Callback query handler for inline buttons
         self.application.add_handler(CallbackQueryHandler(self.handle_callback))
@@ -113,17 +742,81 @@ class BibleVerseBot:
         # Message handler for queries (non-command messages)
         self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_query))
     
-    def _ensure_subscribed(self, user_id):
+    async def _dispatch_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Route a /command message to its handler via the command table"""
+        parts = update.effective_message.text.split()
+        command, _, bot_name = parts[0][1:].partition('@')
+        # Ignore commands addressed to a different bot (e.g. /start@other_bot in groups)
+        if bot_name and bot_name.lower() != (context.bot.username or "").lower():
+            return
+        handler = self._cmd_table.get(command.lower())
+        if handler is None:
+            return
+        # CommandHandler used to populate context.args - do the same here
+        context.args = parts[1:]
+        await handler(update, context)
+    
+    def _user_name_kwargs(self, user):
+        """username/first_name kwargs for score storage, or {} if already stored by this process"""
+        if self._stored_user_names.get(user.id) == (user.username, user.first_name):
+            self._stored_user_names.move_to_end(user.id)
+            return {}
+        return {'username': user.username, 'first_name': user.first_name}
+    
+    def _mark_names_stored(self, user):
+        """Remember the user's names as stored (call only after the storage write succeeded)"""
+        self._stored_user_names[user.id] = (user.username, user.first_name)
+        self._stored_user_names.move_to_end(user.id)
+        if len(self._stored_user_names) > MAX_STORED_USER_NAMES:
+            self._stored_user_names.popitem(last=False)
+    
+    async def _ensure_subscribed(self, user_id):
         """Ensure user is subscribed (auto-subscribe on first interaction)"""
-        if not is_subscribed(user_id):
-            if add_user(user_id):
-                logger.info(f"Auto-subscribed user {user_id} on first interaction")
-                return True
-            else:
-                logger.error(f"Failed to auto-subscribe user {user_id}")
-                return False
+        if user_id in self._subscribed_cache:
+            return True
+        # Storage is only hit on a cache miss, off the event loop
+        was_new, ok = await asyncio.to_thread(ensure_user, user_id)
+        if not ok:
+            logger.error(f"Failed to auto-subscribe user {user_id}")
+            return False
+        if was_new:
+            logger.info(f"Auto-subscribed user {user_id} on first interaction")
+        self._subscribed_cache.add(user_id)
         return True
     
+    def _remember_question(self, user_id, question):
+        """Record a question as recently asked so the user's next questions avoid it"""
+        question_index = get_question_index(question)
+        if question_index is not None:
+            recent = self._recent_questions.get(user_id)
+            if recent is None:
+                recent = self._recent_questions[user_id] = deque(maxlen=MAX_RECENT_QUESTIONS)
+            recent.append(question_index)
+    
+    def _begin_quiz_session(self, user_id, question, difficulty=None, category=None, is_daily_quiz=False):
+        """
+        Start a single-question session in storage and in the in-memory fallback
+        Returns: True if the stored session was written
+        """
+        # Both copies come from the same fields, so the fallback always matches the stored row
+        # Re-inserting moves the user to the newest end; every answer starts a new session
+        self._in_memory_quizzes.pop(user_id, None)
+        self._in_memory_quizzes[user_id] = QuizSession(
+            question_data=question,
+            difficulty=difficulty,
+            category=category,
+            is_daily_quiz=is_daily_quiz
+        )
+        if len(self._in_memory_quizzes) > MAX_IN_MEMORY_QUIZZES:
+            self._in_memory_quizzes.popitem(last=False)
+        try:
+            return bool(start_quiz_session(
+                user_id, 0, question, difficulty=difficulty, category=category, is_daily_quiz=is_daily_quiz
+            ))
+        except Exception as e:
+            logger.error(f"Error starting quiz session for user {user_id}: {e}")
+            return False
+    
     # ==================== Input Validation Methods ====================
     
     def _validate_day_number(self, day_str: str) -> tuple[bool, int | None, str]:
@@ -133,9 +826,8 @@ class BibleVerseBot:
         """
         try:
             day_number = int(day_str)
-            current_year = datetime.now().year
-            is_leap_year = current_year % 4 == 0 and (current_year % 100 != 0 or current_year % 400 == 0)
-            max_days = DAYS_IN_LEAP_YEAR if is_leap_year else DAYS_IN_YEAR
+            current_year = _get_day_cache()[3]
+            max_days = _days_in_year(current_year)
             
             if day_number < 1:
                 return (False, None, f"❌ Day number must be at least 1. Please enter a number between 1 and {max_days}.")
@@ -158,7 +850,7 @@ class BibleVerseBot:
             return (False, "❌ Search term is too long. Please use a shorter book name (max 50 characters).")
         
         # Check for potentially harmful characters (basic sanitization)
-        if any(char in search_term for char in ['<', '>', '{', '}', '[', ']', '`']):
+        if not _SEARCH_FORBIDDEN_CHARS.isdisjoint(search_term):
             return (False, "❌ Invalid characters in search term. Please use only letters, numbers, and spaces.")
         
         return (True, "")
@@ -209,79 +901,48 @@ class BibleVerseBot:
     
     def get_day_of_year(self):
         """Get the current day of the year (1-365/366)"""
-        today = datetime.now()
-        day_of_year = today.timetuple().tm_yday
-        return day_of_year, today.strftime("%B %d, %Y")
+        _, day_of_year, date_str, _ = _get_day_cache()
+        return day_of_year, date_str
     
     def get_bible_reading(self, day_number):
         """Get the Bible reading assignment for the day from the reading plan."""
-        current_year = datetime.now().year
-        reading = get_reading_for_day(day_number, current_year)
+        current_year = _get_day_cache()[3]
+        reading = _cached_reading(day_number, current_year)
         
         if not reading:
             logger.warning(f"No reading found for day {day_number}")
             return "Reading not available for this day"
         
-        # Convert abbreviations to full names
-        reading = expand_bible_reading(reading)
-        
         return reading
     
     def get_encouragement(self, day_number):
         """Get a word of encouragement based on the day"""
-        encouragement_index = (day_number - 1) % len(ENCOURAGEMENT_MESSAGES)
-        return ENCOURAGEMENT_MESSAGES[encouragement_index]
+        return ENCOURAGEMENT_MESSAGES[(day_number - 1) % _ENCOURAGEMENTS_LEN]
     
     def format_message(self, day_number, date_str, reading, encouragement, include_encouragement=True):
         """Format the daily message"""
-        if include_encouragement:
-            message = f"""📖 *Bible in a Year - Day {day_number}*
-
-📅 *Date:* {date_str}
-🔢 *Day {day_number} of 365*
-
-📚 *Today's Reading:*
-{reading}
-
-💝 *Encouragement:*
-{encouragement}
-
-#BibleInAYear #Day{day_number}"""
-        else:
-            message = f"""📖 *Bible in a Year - Day {day_number}*
-
-📅 *Date:* {date_str}
-🔢 *Day {day_number} of 365*
-
-📚 *Reading:*
-{reading}
-
-#BibleInAYear #Day{day_number}"""
-        return message
+        template = _DAILY_TEMPLATE_WITH_ENC if include_encouragement else _DAILY_TEMPLATE_NO_ENC
+        return template.format(day=day_number, date=date_str, reading=reading, enc=encouragement)
     
     def get_quiz_answer_keyboard(self, question_data):
-        """Create inline keyboard with quiz answer options as buttons"""
-        options = question_data['options']
-        keyboard = []
-        for i, option in enumerate(options):
-            keyboard.append([InlineKeyboardButton(f"{i+1}. {option}", callback_data=f"quiz_answer_{i}")])
-        keyboard.append([InlineKeyboardButton("⏹️ Stop Quiz", callback_data="quiz_stop")])
-        return InlineKeyboardMarkup(keyboard)
+        """Return the inline keyboard with quiz answer options as buttons (cached per option set)"""
+        return _answer_keyboard(tuple(question_data['options']))
     
     async def start_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /start command"""
         user = update.effective_user
         user_id = user.id
         
-        # Auto-subscribe user on first interaction
-        is_new = not is_subscribed(user_id)
-        self._ensure_subscribed(user_id)
-        
-        day_number, date_str = self.get_day_of_year()
+        # Auto-subscribe user on first interaction. Always go to storage here so a user
+        # removed by another process (e.g. the daily sender) gets re-subscribed
+        is_new, ok = await asyncio.to_thread(ensure_user, user_id)
+        if ok:
+            self._subscribed_cache.add(user_id)
         
-        welcome_message = f"""📖 *Welcome to Bible in a Year Bot, {user.first_name}!* 🙏
+        # HTML parse mode so names containing Markdown characters (_, *) can't break the reply
+        welcome_message = f"""📖 <b>Welcome to Bible in a Year Bot, {html.escape(user.first_name or '')}!</b> 🙏
 
-*Everything is button-based - no typing needed!*
+<b>Everything is button-based - no typing needed!</b>
 
 Just tap the buttons below to:
 • 📖 Read today's Bible passage
@@ -290,28 +951,27 @@ Just tap the buttons below to:
 • ❓ Ask Bible questions
 • 🏆 Compete on the leaderboard
 
-*Use the buttons below to get started!* 👇"""
+<b>Use the buttons below to get started!</b> 👇"""
         
         try:
             await update.message.reply_text(
                 welcome_message, 
-                parse_mode='Markdown',
+                parse_mode='HTML',
                 reply_markup=self.get_main_menu_keyboard()
             )
             logger.info(f"User {user.id} ({user.username}) started the bot")
         except Forbidden:
             # User blocked the bot - remove from subscriptions
             logger.warning(f"User {user_id} blocked the bot, removing from subscriptions")
-            remove_user(user_id)
+            await asyncio.to_thread(remove_user, user_id)
+            self._subscribed_cache.discard(user_id)
             return
         
         # Send today's reading if this is a new user
         if is_new:
             try:
-                reading = self.get_bible_reading(day_number)
-                encouragement = self.get_encouragement(day_number)
-                message = self.format_message(day_number, date_str, reading, encouragement)
-                mark_day_completed(user_id, day_number)
+                day_number, message = self.get_daily_message()
+                await asyncio.to_thread(mark_day_completed, user_id, day_number)
                 await update.message.reply_text(
                     message, 
                     parse_mode='Markdown',
@@ -321,11 +981,16 @@ Just tap the buttons below to:
             except Forbidden:
                 # User blocked the bot - remove from subscriptions
                 logger.warning(f"User {user_id} blocked the bot, removing from subscriptions")
-                remove_user(user_id)
+                await asyncio.to_thread(remove_user, user_id)
+                self._subscribed_cache.discard(user_id)
             except Exception as e:
                 logger.error(f"Error sending today's reading to new user {user_id}: {e}")
     
     def get_main_menu_keyboard(self):
+        """Return the prebuilt main menu keyboard"""
+        return self._main_menu_keyboard
+    
+    def _build_main_menu_keyboard(self):
         """Create comprehensive main menu inline keyboard"""
         keyboard = [
             [
@@ -356,6 +1021,10 @@ Just tap the buttons below to:
         return InlineKeyboardMarkup(keyboard)
     
     def get_quiz_menu_keyboard(self):
+        """Return the prebuilt quiz menu keyboard"""
+        return self._quiz_menu_keyboard
+    
+    def _build_quiz_menu_keyboard(self):
         """Create enhanced quiz difficulty selection keyboard"""
         keyboard = [
             [
@@ -374,12 +1043,16 @@ Just tap the buttons below to:
                 InlineKeyboardButton("🏆 Leaderboard", callback_data="menu_leaderboard")
             ],
             [
-                InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")
+                _MAIN_MENU_BUTTON
             ]
         ]
         return InlineKeyboardMarkup(keyboard)
     
     def get_reading_menu_keyboard(self):
+        """Return the prebuilt reading menu keyboard"""
+        return self._reading_menu_keyboard
+    
+    def _build_reading_menu_keyboard(self):
         """Create enhanced reading menu keyboard"""
         keyboard = [
             [
@@ -395,137 +1068,92 @@ Just tap the buttons below to:
                 InlineKeyboardButton("📚 Search", callback_data="menu_search")
             ],
             [
-                InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")
+                _MAIN_MENU_BUTTON
             ]
         ]
         return InlineKeyboardMarkup(keyboard)
     
     def get_quick_actions_keyboard(self):
+        """Return the prebuilt quick actions keyboard"""
+        return self._quick_actions_keyboard
+    
+    def _build_quick_actions_keyboard(self):
         """Create quick action buttons for common commands"""
         keyboard = [
-            [
-                InlineKeyboardButton("📖 Today", callback_data="menu_today"),
-                InlineKeyboardButton("🎯 Quiz", callback_data="menu_quiz"),
-                InlineKeyboardButton("📊 Progress", callback_data="menu_progress")
-            ],
-            [
-                InlineKeyboardButton("⭐ Challenge", callback_data="menu_daily_quiz"),
-                InlineKeyboardButton("📖 Verse", callback_data="menu_verse"),
-                InlineKeyboardButton("🏆 Badges", callback_data="menu_achievements")
-            ],
-            [
-                InlineKeyboardButton("📈 Leaderboard", callback_data="menu_leaderboard"),
-                InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")
-            ]
-        ]
-        return InlineKeyboardMarkup(keyboard)
-    
-    async def menu_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /menu command - show enhanced main menu"""
-        user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
-        
-        # Get user stats for personalized menu
-        progress = get_user_progress(user_id)
-        current_streak = get_current_streak(user_id)
-        score = get_user_score(user_id)
-        
-        menu_text = f"""📱 *Main Menu*
-
-👋 Welcome! Choose an option below:
-
-📊 *Quick Stats:*
-• Reading: {progress['total_completed']} days completed
-• Streak: {current_streak} days 🔥
-• Quiz Score: {score.get('total_correct', 0)} correct answers
-
-{MESSAGE_SEPARATOR}
-*Tap a button to get started!* 👇"""
-        
-        await update.message.reply_text(
-            menu_text,
-            parse_mode='Markdown',
-            reply_markup=self.get_main_menu_keyboard()
-        )
-    
-    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /help command"""
-        # Ensure user is subscribed
-        self._ensure_subscribed(update.effective_user.id)
-        
-        help_text = """📖 *Bible in a Year Bot - Help*
-
-*🎯 Main Features:*
-Everything is button-based! Just tap the buttons below to interact.
-
-*📚 Reading Commands:*
-/today - Get today's Bible reading
-/day [number] - Get reading for a specific day (1-365)
-/search [book] - Search for a Bible book in the reading plan
-
-*🎯 Quiz Commands:*
-/quiz - Start a random Bible quiz
-/quiz_easy - Start an easy quiz
-/quiz_medium - Start a medium quiz
-/quiz_hard - Start a hard quiz
-/daily_quiz or /challenge - Take today's special daily challenge quiz
-/score - View your quiz statistics and rank
-/leaderboard - See top 10 players
-/quiz_stop - Stop your current quiz session
-
-*⭐ New Features:*
-/daily_quiz - Take today's special quiz challenge (one per day)
-/verse - Get today's inspiring Bible verse
-/verse [reference] - Get a specific verse (e.g., /verse John 3:16)
-/achievements or /badges - View your unlocked achievements
-/remind [time] - Set reading reminders (e.g., /remind 8am)
-/remind_off - Disable reading reminders
-
-*❓ Q&A Commands:*
-/ask [question] - Ask a Bible question and get an answer
-/question [question] - Same as /ask
-
-*📊 Reading Progress:*
-/progress - View your reading progress
-/streak - See your current reading streak
-/stats - Detailed reading statistics
-/completed [day] - Mark a specific day as completed
-
-*📊 Quiz Features:*
-• 280+ questions covering all 66 books of the Bible
-• Difficulty levels: Easy, Medium, Hard
-• Daily Challenge Quiz - one special quiz per day
-• Leaderboard rankings based on best scores
-• Achievement badges for milestones
-
-*🏆 Achievements:*
-Unlock badges by:
-• Completing readings
-• Maintaining streaks
-• Answering quiz questions
-• Completing daily challenges
-
-*📬 Daily Messages:*
-You'll automatically receive a message every day at 4:00 AM GMT with that day's reading.
-
-*About:*
-This bot follows a complete Bible in a Year reading plan, combining Old Testament and New Testament readings each day."""
+            [
+                InlineKeyboardButton("📖 Today", callback_data="menu_today"),
+                InlineKeyboardButton("🎯 Quiz", callback_data="menu_quiz"),
+                InlineKeyboardButton("📊 Progress", callback_data="menu_progress")
+            ],
+            [
+                InlineKeyboardButton("⭐ Challenge", callback_data="menu_daily_quiz"),
+                InlineKeyboardButton("📖 Verse", callback_data="menu_verse"),
+                InlineKeyboardButton("🏆 Badges", callback_data="menu_achievements")
+            ],
+            [
+                InlineKeyboardButton("📈 Leaderboard", callback_data="menu_leaderboard"),
+                _MAIN_MENU_BUTTON
+            ]
+        ]
+        return InlineKeyboardMarkup(keyboard)
+    
+    def get_back_to_menu_keyboard(self):
+        """Return the prebuilt single "Main Menu" button keyboard"""
+        return self._back_to_menu_keyboard
+    
+    def get_verse_keyboard(self):
+        """Return the prebuilt verse of the day keyboard"""
+        return self._verse_keyboard
+    
+    def get_progress_navigation_keyboard(self):
+        """Return the prebuilt progress/streak navigation keyboard"""
+        return self._progress_navigation_keyboard
+    
+    def _build_column_keyboard(self, *buttons):
+        """Create a one-button-per-row keyboard from (text, callback_data) pairs, ending with Main Menu"""
+        keyboard = [[InlineKeyboardButton(text, callback_data=data)] for text, data in buttons]
+        keyboard.append([_MAIN_MENU_BUTTON])
+        return InlineKeyboardMarkup(keyboard)
+    
+    async def menu_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /menu command - show enhanced main menu"""
+        user_id = update.effective_user.id
+        await self._ensure_subscribed(user_id)
+        
+        # Get user stats for personalized menu (the progress and score files are read concurrently)
+        dashboard, score = await asyncio.gather(
+            asyncio.to_thread(get_user_dashboard, user_id),
+            asyncio.to_thread(get_user_score, user_id)
+        )
+        
+        menu_text = _MENU_TEMPLATE.format(
+            completed=dashboard['progress']['total_completed'],
+            streak=dashboard['current_streak'],
+            correct=score.get('total_correct', 0)
+        )
+        
+        await update.message.reply_text(
+            menu_text,
+            parse_mode='Markdown',
+            reply_markup=self.get_main_menu_keyboard()
+        )
+    
+    async def help_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /help command"""
+        # Ensure user is subscribed
+        await self._ensure_subscribed(update.effective_user.id)
         
-        await update.message.reply_text(help_text, parse_mode='Markdown')
+        await update.message.reply_text(_HELP_TEXT, parse_mode='Markdown')
     
     async def today_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /today command"""
         # Ensure user is subscribed
-        self._ensure_subscribed(update.effective_user.id)
-        day_number, date_str = self.get_day_of_year()
-        reading = self.get_bible_reading(day_number)
-        encouragement = self.get_encouragement(day_number)
-        
-        message = self.format_message(day_number, date_str, reading, encouragement)
+        await self._ensure_subscribed(update.effective_user.id)
+        _, message = self.get_daily_message()
         
         try:
             await update.message.reply_text(message, parse_mode='Markdown')
-            logger.info(f"Sent today's reading to user {update.effective_user.id}")
+            logger.info("Sent today's reading to user %s", update.effective_user.id)
         except TelegramError as e:
             logger.error(f"Error sending message: {e}")
             await update.message.reply_text("Sorry, there was an error sending the message.")
@@ -533,7 +1161,7 @@ This bot follows a complete Bible in a Year reading plan, combining Old Testamen
     async def day_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /day command with optional day number"""
         # Ensure user is subscribed
-        self._ensure_subscribed(update.effective_user.id)
+        await self._ensure_subscribed(update.effective_user.id)
         if context.args:
             is_valid, day_number, error_msg = self._validate_day_number(context.args[0])
             if not is_valid:
@@ -542,20 +1170,11 @@ This bot follows a complete Bible in a Year reading plan, combining Old Testamen
         else:
             day_number, _ = self.get_day_of_year()
         
-        # Calculate date for that day (approximate)
-        current_year = datetime.now().year
-        start_date = datetime(current_year, 1, 1)
-        target_date = start_date + timedelta(days=day_number - 1)
-        date_str = target_date.strftime("%B %d, %Y")
-        
-        reading = self.get_bible_reading(day_number)
-        encouragement = self.get_encouragement(day_number)
-        
-        message = self.format_message(day_number, date_str, reading, encouragement)
+        message = self.get_day_message(day_number)
         
         try:
             await update.message.reply_text(message, parse_mode='Markdown')
-            logger.info(f"Sent day {day_number} reading to user {update.effective_user.id}")
+            logger.info("Sent day %s reading to user %s", day_number, update.effective_user.id)
         except TelegramError as e:
             logger.error(f"Error sending message: {e}")
             await update.message.reply_text("Sorry, there was an error sending the message.")
@@ -563,7 +1182,7 @@ This bot follows a complete Bible in a Year reading plan, combining Old Testamen
     async def search_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /search command - search for Bible books in the reading plan"""
         # Ensure user is subscribed
-        self._ensure_subscribed(update.effective_user.id)
+        await self._ensure_subscribed(update.effective_user.id)
         if not context.args:
             await update.message.reply_text(
                 "🔍 *Search for Bible Books*\n\n"
@@ -585,18 +1204,9 @@ This bot follows a complete Bible in a Year reading plan, combining Old Testamen
             return
         
         search_term = search_term.lower()
-        current_year = datetime.now().year
-        plan = READING_PLANS.get(current_year, READING_PLANS[max(READING_PLANS.keys())])
-        
-        # Find matching books (both full names and abbreviations)
-        matching_books = []
-        for abbrev, full_name in BIBLE_BOOK_ABBREVIATIONS.items():
-            if (search_term in full_name.lower() or 
-                search_term in abbrev.lower().replace('.', '') or
-                abbrev.lower().replace('.', '') in search_term):
-                matching_books.append((abbrev, full_name))
+        book_names, found_days = _search_plan(search_term, _get_day_cache()[3])
         
-        if not matching_books:
+        if not book_names:
             await update.message.reply_text(
                 f"❌ No Bible book found matching '{search_term}'.\n\n"
                 "Try searching for:\n"
@@ -607,385 +1217,127 @@ This bot follows a complete Bible in a Year reading plan, combining Old Testamen
             )
             return
         
-        # Search for days containing these books
-        found_days = []
-        for day_num, reading in plan.items():
-            reading_lower = reading.lower()
-            for abbrev, full_name in matching_books:
-                # Check if abbreviation or full name appears in reading
-                if abbrev.lower() in reading_lower or full_name.lower() in reading_lower:
-                    found_days.append((day_num, reading))
-                    break
-        
         if not found_days:
             await update.message.reply_text(
-                f"❌ No readings found for '{matching_books[0][1]}' in the current reading plan."
+                f"❌ No readings found for '{book_names[0]}' in the current reading plan."
             )
             return
         
         # Format results (limit to first 20 to avoid message too long)
         results = found_days[:20]
-        book_names = [full_name for _, full_name in matching_books]
         book_display = book_names[0] if len(book_names) == 1 else f"{', '.join(book_names[:3])}"
         
-        result_text = f"🔍 *Search Results: {book_display}*\n\n"
+        # HTML parse mode: readings are escaped, so Telegram never rejects the entities
+        result_text = f"🔍 <b>Search Results: {html.escape(book_display)}</b>\n\n"
         result_text += f"Found in {len(found_days)} day(s):\n\n"
         
-        for day_num, reading in results:
-            expanded_reading = expand_bible_reading(reading)
-            result_text += f"*Day {day_num}:* {expanded_reading}\n"
+        result_text += "".join(
+            f"<b>Day {day_num}:</b> {html.escape(expanded_reading)}\n" for day_num, expanded_reading in results
+        )
         
         if len(found_days) > 20:
             result_text += f"\n... and {len(found_days) - 20} more day(s)"
         
         result_text += f"\n\n💡 Use /day [number] to get the full reading for any day."
         
-        await update.message.reply_text(result_text, parse_mode='Markdown')
-        logger.info(f"User {update.effective_user.id} searched for '{search_term}', found {len(found_days)} results")
+        await update.message.reply_text(result_text, parse_mode='HTML')
+        logger.info("User %s searched for '%s', found %s results", update.effective_user.id, search_term, len(found_days))
     
     async def quiz_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /quiz command - start a Bible quiz"""
-        # Ensure user is subscribed
-        user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
-        
-        # Check if user already has an active quiz
-        active_quiz = get_quiz_session(user_id)
-        if active_quiz:
-            await update.message.reply_text(
-                "🎯 *You already have an active quiz!*\n\n"
-                f"Current score: {active_quiz['score']}/{active_quiz['total']}\n\n"
-                "Answer the current question or use /quiz_stop to start a new quiz."
-            )
-            return
-        
         # Parse optional arguments for difficulty and category
         difficulty = None
         category = None
         
         if context.args:
-            args_lower = [arg.lower() for arg in context.args]
+            args_set = {arg.lower() for arg in context.args}
             
-            # Check for difficulty
-            for diff in DIFFICULTIES:
-                if diff in args_lower:
-                    difficulty = diff
-                    break
-            
-            # Check for category
-            for cat_key, cat_name in CATEGORIES.items():
-                if cat_key in args_lower or cat_name.lower() in args_lower:
-                    category = cat_key
-                    break
-        
-        # Start a new quiz with optional filters
-        # Get recently asked question indices for this user to avoid repeats
-        from quiz_questions import get_question_index
-        recent_indices = self._recent_questions.get(str(user_id), [])
-        
-        question = get_random_question(difficulty=difficulty, category=category, exclude_indices=recent_indices)
-        
-        # Track this question to avoid repeats
-        question_index = get_question_index(question)
-        if question_index is not None:
-            if str(user_id) not in self._recent_questions:
-                self._recent_questions[str(user_id)] = []
-            self._recent_questions[str(user_id)].append(question_index)
-            # Keep only last MAX_RECENT_QUESTIONS to avoid memory issues
-            if len(self._recent_questions[str(user_id)]) > MAX_RECENT_QUESTIONS:
-                self._recent_questions[str(user_id)] = self._recent_questions[str(user_id)][-MAX_RECENT_QUESTIONS:]
-        
-        # Try to save to file, but also save in-memory as fallback
-        try:
-            start_quiz_session(user_id, 0, question, difficulty=difficulty, category=category)
-        except Exception as e:
-            logger.error(f"Error starting quiz session in file for user {user_id}: {e}")
-        
-        # Always save in-memory as fallback
-        user_id_str = str(user_id)
-        self._in_memory_quizzes[user_id_str] = {
-            'question_index': 0,
-            'question_data': question,
-            'score': 0,
-            'total': 0,
-            'started_at': None,
-            'difficulty': difficulty,
-            'category': category
-        }
-        
-        # Format question with options
-        options_text = ""
-        for i, option in enumerate(question['options']):
-            options_text += f"{i+1}. {option}\n"
-        
-        # Build difficulty and category info
-        diff_info = f"Difficulty: {question.get('difficulty', 'unknown').title()}\n" if question.get('difficulty') else ""
-        cat_info = f"Category: {CATEGORIES.get(question.get('category', ''), 'General')}\n" if question.get('category') else ""
-        
-        # Use HTML parse mode to avoid Markdown escaping issues
-        # Escape HTML special characters in question text
-        escaped_question = html.escape(question['question'])
-        quiz_message = f"""🎯 <b>Bible Quiz Started!</b>
-
-{diff_info}{cat_info}<b>Question:</b>
-{escaped_question}
-
-<b>Tap your answer below:</b>"""
+            # First difficulty / category (in declaration order) named in the args
+            difficulty = next((diff for diff in DIFFICULTIES if diff in args_set), None)
+            category = next(
+                (cat_key for cat_key, names in _CATEGORY_ARG_NAMES if not names.isdisjoint(args_set)),
+                None
+            )
         
-        await update.message.reply_text(
-            quiz_message, 
-            parse_mode='HTML',
-            reply_markup=self.get_quiz_answer_keyboard(question)
-        )
-        logger.info(f"User {user_id} started a quiz (difficulty: {difficulty}, category: {category})")
+        await self._start_quiz(update, difficulty, "Bible Quiz Started!", category=category, show_info=True)
     
-    async def quiz_easy_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
-        """Handle /quiz_easy command - start an easy quiz"""
+    async def _start_quiz(self, update: Update, difficulty: str | None, title: str, category=None, show_info=False):
+        """
+        Start a quiz with optional difficulty/category filters (shared by /quiz, /quiz_easy, /quiz_medium, /quiz_hard)
+        show_info adds the question's difficulty and category lines to the message
+        """
         # Ensure user is subscribed
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         # Check if user already has an active quiz
-        active_quiz = get_quiz_session(user_id)
+        active_quiz = await asyncio.to_thread(get_quiz_session, user_id)
         if active_quiz:
             await update.message.reply_text(
-                "🎯 *You already have an active quiz!*\n\n"
-                f"Current score: {active_quiz['score']}/{active_quiz['total']}\n\n"
-                "Answer the current question or use /quiz_stop to start a new quiz."
+                _ACTIVE_QUIZ_TEMPLATE.format(
+                    score=active_quiz['score'], total=active_quiz['total'], hint=_ACTIVE_QUIZ_HINT_ANSWER
+                )
             )
             return
         
-        # Start a new quiz with easy difficulty
-        from quiz_questions import get_question_index
-        recent_indices = self._recent_questions.get(str(user_id), [])
-        question = get_random_question(difficulty="easy", exclude_indices=recent_indices)
+        # Start a new quiz, avoiding this user's recently asked questions
+        recent_indices = self._recent_questions.get(user_id)
+        question = get_random_question(difficulty=difficulty, category=category, exclude_indices=recent_indices)
         
         # Track this question to avoid repeats
-        question_index = get_question_index(question)
-        if question_index is not None:
-            if str(user_id) not in self._recent_questions:
-                self._recent_questions[str(user_id)] = []
-            self._recent_questions[str(user_id)].append(question_index)
-            if len(self._recent_questions[str(user_id)]) > MAX_RECENT_QUESTIONS:
-                self._recent_questions[str(user_id)] = self._recent_questions[str(user_id)][-MAX_RECENT_QUESTIONS:]
+        self._remember_question(user_id, question)
         
-        # Try to save to file, but also save in-memory as fallback
-        try:
-            start_quiz_session(user_id, 0, question, difficulty="easy", category=None)
-        except Exception as e:
-            logger.error(f"Error starting quiz session in file for user {user_id}: {e}")
-        
-        # Always save in-memory as fallback
-        user_id_str = str(user_id)
-        self._in_memory_quizzes[user_id_str] = {
-            'question_index': 0,
-            'question_data': question,
-            'score': 0,
-            'total': 0,
-            'started_at': None,
-            'difficulty': "easy",
-            'category': None
-        }
+        self._begin_quiz_session(user_id, question, difficulty=difficulty, category=category)
         
-        # Format question with options
-        options_text = ""
-        for i, option in enumerate(question['options']):
-            options_text += f"{i+1}. {option}\n"
+        # Difficulty and category info (options are shown on the answer keyboard)
+        info = ""
+        if show_info:
+            info = (
+                _DIFFICULTY_LINES.get(question.get('difficulty'), "")
+                + _CATEGORY_LINES.get(question.get('category'), "")
+            )
         
         # Escape HTML special characters in question text
-        escaped_question = html.escape(question['question'])
-        quiz_message = f"""🎯 <b>Easy Bible Quiz Started!</b>
-
-<b>Question:</b>
-{escaped_question}
-
-<b>Tap your answer below:</b>"""
+        quiz_message = _QUIZ_STARTED_TEMPLATE.format(
+            title=title, info=info, question=html.escape(question['question'])
+        )
         
         await update.message.reply_text(
             quiz_message, 
             parse_mode='HTML',
             reply_markup=self.get_quiz_answer_keyboard(question)
         )
-        logger.info(f"User {user_id} started an easy quiz")
+        logger.info("User %s started a quiz (difficulty: %s, category: %s)", user_id, difficulty, category)
+    
+    async def quiz_easy_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Handle /quiz_easy command - start an easy quiz"""
+        await self._start_quiz(update, "easy", "Easy Bible Quiz Started!")
     
     async def quiz_medium_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /quiz_medium command - start a medium quiz"""
-        # Ensure user is subscribed
-        user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
-        
-        # Check if user already has an active quiz
-        active_quiz = get_quiz_session(user_id)
-        if active_quiz:
-            await update.message.reply_text(
-                "🎯 *You already have an active quiz!*\n\n"
-                f"Current score: {active_quiz['score']}/{active_quiz['total']}\n\n"
-                "Answer the current question or use /quiz_stop to start a new quiz."
-            )
-            return
-        
-        # Start a new quiz with medium difficulty
-        from quiz_questions import get_question_index
-        recent_indices = self._recent_questions.get(str(user_id), [])
-        question = get_random_question(difficulty="medium", exclude_indices=recent_indices)
-        
-        # Track this question to avoid repeats
-        question_index = get_question_index(question)
-        if question_index is not None:
-            if str(user_id) not in self._recent_questions:
-                self._recent_questions[str(user_id)] = []
-            self._recent_questions[str(user_id)].append(question_index)
-            if len(self._recent_questions[str(user_id)]) > MAX_RECENT_QUESTIONS:
-                self._recent_questions[str(user_id)] = self._recent_questions[str(user_id)][-MAX_RECENT_QUESTIONS:]
-        
-        # Try to save to file, but also save in-memory as fallback
-        try:
-            start_quiz_session(user_id, 0, question, difficulty="medium", category=None)
-        except Exception as e:
-            logger.error(f"Error starting quiz session in file for user {user_id}: {e}")
-        
-        # Always save in-memory as fallback
-        user_id_str = str(user_id)
-        self._in_memory_quizzes[user_id_str] = {
-            'question_index': 0,
-            'question_data': question,
-            'score': 0,
-            'total': 0,
-            'started_at': None,
-            'difficulty': "medium",
-            'category': None
-        }
-        
-        # Format question with options
-        options_text = ""
-        for i, option in enumerate(question['options']):
-            options_text += f"{i+1}. {option}\n"
-        
-        # Escape HTML special characters in question text
-        escaped_question = html.escape(question['question'])
-        quiz_message = f"""🎯 <b>Medium Bible Quiz Started!</b>
-
-<b>Question:</b>
-{escaped_question}
-
-<b>Tap your answer below:</b>"""
-        
-        await update.message.reply_text(
-            quiz_message, 
-            parse_mode='HTML',
-            reply_markup=self.get_quiz_answer_keyboard(question)
-        )
-        logger.info(f"User {user_id} started a medium quiz")
+        await self._start_quiz(update, "medium", "Medium Bible Quiz Started!")
     
     async def quiz_hard_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /quiz_hard command - start a hard quiz"""
-        # Ensure user is subscribed
-        user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
-        
-        # Check if user already has an active quiz
-        active_quiz = get_quiz_session(user_id)
-        if active_quiz:
-            await update.message.reply_text(
-                "🎯 *You already have an active quiz!*\n\n"
-                f"Current score: {active_quiz['score']}/{active_quiz['total']}\n\n"
-                "Answer the current question or use /quiz_stop to start a new quiz."
-            )
-            return
-        
-        # Start a new quiz with hard difficulty
-        from quiz_questions import get_question_index
-        recent_indices = self._recent_questions.get(str(user_id), [])
-        question = get_random_question(difficulty="hard", exclude_indices=recent_indices)
-        
-        # Track this question to avoid repeats
-        question_index = get_question_index(question)
-        if question_index is not None:
-            if str(user_id) not in self._recent_questions:
-                self._recent_questions[str(user_id)] = []
-            self._recent_questions[str(user_id)].append(question_index)
-            if len(self._recent_questions[str(user_id)]) > MAX_RECENT_QUESTIONS:
-                self._recent_questions[str(user_id)] = self._recent_questions[str(user_id)][-MAX_RECENT_QUESTIONS:]
-        
-        # Try to save to file, but also save in-memory as fallback
-        try:
-            start_quiz_session(user_id, 0, question, difficulty="hard", category=None)
-        except Exception as e:
-            logger.error(f"Error starting quiz session in file for user {user_id}: {e}")
-        
-        # Always save in-memory as fallback
-        user_id_str = str(user_id)
-        self._in_memory_quizzes[user_id_str] = {
-            'question_index': 0,
-            'question_data': question,
-            'score': 0,
-            'total': 0,
-            'started_at': None,
-            'difficulty': "hard",
-            'category': None
-        }
-        
-        # Format question with options
-        options_text = ""
-        for i, option in enumerate(question['options']):
-            options_text += f"{i+1}. {option}\n"
-        
-        # Escape HTML special characters in question text
-        escaped_question = html.escape(question['question'])
-        quiz_message = f"""🎯 <b>Hard Bible Quiz Started!</b>
-
-<b>Question:</b>
-{escaped_question}
-
-<b>Tap your answer below:</b>"""
-        
-        await update.message.reply_text(
-            quiz_message, 
-            parse_mode='HTML',
-            reply_markup=self.get_quiz_answer_keyboard(question)
-        )
-        logger.info(f"User {user_id} started a hard quiz")
+        await self._start_quiz(update, "hard", "Hard Bible Quiz Started!")
     
     async def score_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /score command - show user's quiz statistics"""
         # Ensure user is subscribed
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
-        score = get_user_score(user_id)
-        stats = get_stats()
+        score = await asyncio.to_thread(get_user_score, user_id)
         
         if score['total_answered'] == 0:
-            stats_info = f"""📚 *Quiz Database:*
-• Total Questions: {stats['total']}
-• Easy: {stats['by_difficulty']['easy']}
-• Medium: {stats['by_difficulty']['medium']}
-• Hard: {stats['by_difficulty']['hard']}
-
-*Categories:*
-• Old Testament: {stats['by_category']['old_testament']}
-• New Testament: {stats['by_category']['new_testament']}
-• Bible Facts: {stats['by_category']['bible_facts']}"""
-            
-            await update.message.reply_text(
-                "📊 *Your Quiz Score*\n\n"
-                "You haven't taken any quizzes yet!\n\n"
-                f"{stats_info}\n\n"
-                "Use /quiz to start your first Bible quiz! 🎯\n\n"
-                "*Try:*\n"
-                "• /quiz easy - Easy questions\n"
-                "• /quiz medium - Medium difficulty\n"
-                "• /quiz hard - Hard questions\n"
-                "• /quiz old_testament - OT questions\n"
-                "• /quiz new_testament - NT questions"
-            )
+            await update.message.reply_text(_no_score_message())
             return
         
         accuracy = (score['total_correct'] / score['total_answered']) * 100 if score['total_answered'] > 0 else 0
         
         # Build rank info
         rank_info = ""
-        user_rank, total_players = get_user_rank(user_id)
+        user_rank, total_players = await asyncio.to_thread(get_user_rank, user_id)
         if user_rank:
             rank_info = f"🏅 *Rank:* #{user_rank}\n"
         
@@ -1002,21 +1354,7 @@ This bot follows a complete Bible in a Year reading plan, combining Old Testamen
 {rank_info}✅ *Total Correct:* {score['total_correct']}
 📝 *Total Answered:* {score['total_answered']}
 📈 *Overall Accuracy:* {accuracy:.1f}%
-{best_session_info}📚 *Quizzes Completed:* {score.get('quizzes_completed', 0)}
-
-*Quiz Options:*
-• /quiz - Random question
-• /quiz_easy - Easy questions only
-• /quiz_medium - Medium difficulty only
-• /quiz_hard - Hard questions only
-• /quiz old_testament - Old Testament
-• /quiz new_testament - New Testament
-• /quiz bible_facts - Bible Facts
-
-*Leaderboard:*
-• /leaderboard - See top players
-
-Keep learning! Use /quiz to take another quiz."""
+{best_session_info}📚 *Quizzes Completed:* {score.get('quizzes_completed', 0)}""" + _SCORE_FOOTER
         
         await update.message.reply_text(score_message, parse_mode='Markdown')
     
@@ -1024,14 +1362,15 @@ Keep learning! Use /quiz to take another quiz."""
         """Handle /leaderboard command - show top players"""
         # Ensure user is subscribed
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         # Update user info
         user = update.effective_user
-        update_user_info(user_id, username=user.username, first_name=user.first_name)
+        name_kwargs = self._user_name_kwargs(user)
+        if name_kwargs and await asyncio.to_thread(update_user_info, user_id, **name_kwargs):
+            self._mark_names_stored(user)
         
-        leaderboard = get_leaderboard(limit=LEADERBOARD_TOP_N)
-        user_rank, user_data = get_user_rank(user_id)
+        leaderboard, user_rank, user_data, _ = await asyncio.to_thread(get_leaderboard_and_rank, user_id, limit=LEADERBOARD_TOP_N)
         
         if not leaderboard:
             await update.message.reply_text(
@@ -1041,23 +1380,24 @@ Keep learning! Use /quiz to take another quiz."""
             return
         
         # Build leaderboard message
-        leaderboard_text = "🏆 *Top Players Leaderboard*\n\n"
+        parts = ["🏆 *Top Players Leaderboard*\n\n"]
         
-        medals = ["🥇", "🥈", "🥉"]
         for idx, player in enumerate(leaderboard, start=1):
-            medal = medals[idx - 1] if idx <= 3 else f"{idx}."
+            medal = _RANK_LABELS[idx - 1]
             
             # Get display name
-            display_name = player.get('username')
-            if not display_name:
+            username = player.get('username')
+            if username:
+                display_name = f"@{username}"
+            else:
                 display_name = player.get('first_name', f"User {player['user_id']}")
-            if display_name:
-                display_name = f"@{display_name}" if player.get('username') else display_name
             
-            leaderboard_text += f"{medal} {display_name}\n"
-            leaderboard_text += f"   Best: {player['best_score']:.1f}% | "
-            leaderboard_text += f"Correct: {player['total_correct']}/{player['total_answered']} | "
-            leaderboard_text += f"Quizzes: {player['quizzes_completed']}\n\n"
+            parts.append(
+                f"{medal} {display_name}\n"
+                f"   Best: {player['best_score']:.1f}% | "
+                f"Correct: {player['total_correct']}/{player['total_answered']} | "
+                f"Quizzes: {player['quizzes_completed']}\n\n"
+            )
         
         # Add user's rank if they're not in top LEADERBOARD_TOP_N
         if user_rank and user_rank > LEADERBOARD_TOP_N:
@@ -1066,16 +1406,15 @@ Keep learning! Use /quiz to take another quiz."""
             if user.username:
                 user_display = f"@{user_display}"
             
-            leaderboard_text += f"{MESSAGE_SEPARATOR}\n"
-            leaderboard_text += f"Your Rank: #{user_rank}\n"
-            leaderboard_text += f"Best: {user_data['best_score']:.1f}% | "
-            leaderboard_text += f"Correct: {user_data['total_correct']}/{user_data['total_answered']}\n"
+            parts.append(
+                f"{MESSAGE_SEPARATOR}\n"
+                f"Your Rank: #{user_rank}\n"
+                f"Best: {user_data['best_score']:.1f}% | "
+                f"Correct: {user_data['total_correct']}/{user_data['total_answered']}\n"
+            )
         
-        leaderboard_text += "\n*Commands:*\n"
-        leaderboard_text += "• /quiz_easy - Easy questions\n"
-        leaderboard_text += "• /quiz_medium - Medium questions\n"
-        leaderboard_text += "• /quiz_hard - Hard questions\n"
-        leaderboard_text += "• /score - Your stats"
+        parts.append(_LEADERBOARD_FOOTER)
+        leaderboard_text = "".join(parts)
         
         await update.message.reply_text(
             leaderboard_text, 
@@ -1089,13 +1428,12 @@ Keep learning! Use /quiz to take another quiz."""
         
         # Check in-memory first
         session = None
-        if str(user_id) in self._in_memory_quizzes:
-            session = self._in_memory_quizzes[str(user_id)]
-            del self._in_memory_quizzes[str(user_id)]
+        if user_id in self._in_memory_quizzes:
+            session = self._in_memory_quizzes.pop(user_id).to_dict()
         
         # Also check file-based storage
         if not session:
-            session = end_quiz_session(user_id)
+            session = await asyncio.to_thread(end_quiz_session, user_id)
         
         if session:
             # Check if this was a daily quiz
@@ -1104,29 +1442,27 @@ Keep learning! Use /quiz to take another quiz."""
             # Save the quiz results
             if session['total'] > 0:
                 user = update.effective_user
-                update_user_score(
+                if await asyncio.to_thread(update_user_score,
                     user_id, 
                     session['score'], 
                     session['total'],
-                    username=user.username,
-                    first_name=user.first_name
-                )
+                    **self._user_name_kwargs(user)
+                ):
+                    self._mark_names_stored(user)
                 accuracy = (session['score'] / session['total']) * 100
                 
                 # Mark daily quiz as completed if applicable
                 if is_daily_quiz:
-                    mark_daily_quiz_completed(user_id, session['score'], session['total'])
+                    await asyncio.to_thread(mark_daily_quiz_completed, user_id, session['score'], session['total'])
                     # Check for achievements
-                    newly_unlocked = check_and_award_achievements(user_id)
+                    newly_unlocked = await asyncio.to_thread(check_and_award_achievements, user_id)
                     
                     message = f"✅ *Daily Challenge Completed!*\n\n"
                     message += f"Final Score: {session['score']}/{session['total']} ({accuracy:.1f}%)\n\n"
                     
                     if newly_unlocked:
                         message += "🎉 *New Achievement Unlocked!*\n\n"
-                        for achievement_id in newly_unlocked:
-                            achievement = ACHIEVEMENTS[achievement_id]
-                            message += f"{achievement['emoji']} {achievement['name']}\n"
+                        message += _achievement_lines(newly_unlocked)
                         message += "\n"
                     
                     message += "Come back tomorrow for a new challenge!"
@@ -1161,12 +1497,11 @@ Keep learning! Use /quiz to take another quiz."""
         """Handle /ask command - answer Bible questions with references"""
         # Ensure user is subscribed
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         # Get the question from command arguments
         if not context.args:
-            topics = get_all_topics()
-            topics_list = "\n".join([f"• {topic}" for topic in topics[:15]])
+            topics_list = _topics_list(15)
             
             await update.message.reply_text(
                 f"❓ *Ask a Bible Question*\n\n"
@@ -1201,10 +1536,8 @@ Keep learning! Use /quiz to take another quiz."""
             response += f"💡 <b>Answer:</b>\n{answer_data['answer']}\n\n"
             response += "📖 <b>Bible References:</b>\n"
             
-            for ref in answer_data['references']:
-                # Escape HTML special characters in references
-                ref_escaped = ref.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-                response += f"• {ref_escaped}\n"
+            # Escape HTML special characters in references (single pass)
+            response += "".join(f"• {html.escape(ref, quote=False)}\n" for ref in answer_data['references'])
             
             response += "\n💡 <b>Tip:</b> Use /ask [question] to ask more questions!"
             
@@ -1212,11 +1545,17 @@ Keep learning! Use /quiz to take another quiz."""
                 await update.message.reply_text(response, parse_mode='HTML')
             except Exception as e:
                 logger.error(f"Error sending ask response: {e}")
-                # Fallback to plain text
-                response_plain = response.replace('<b>', '').replace('</b>', '').replace('&amp;', '&').replace('&lt;', '<').replace('&gt;', '>')
+                # Fallback to plain text, built from the raw parts (no tags to strip or entities to undo)
+                response_plain = (
+                    f"❓ Question: {answer_data['question']}\n\n"
+                    f"💡 Answer:\n{answer_data['answer']}\n\n"
+                    "📖 Bible References:\n"
+                    + "".join(f"• {ref}\n" for ref in answer_data['references'])
+                    + "\n💡 Tip: Use /ask [question] to ask more questions!"
+                )
                 await update.message.reply_text(response_plain)
             
-            logger.info(f"User {user_id} asked: {user_question}")
+            logger.info("User %s asked: %s", user_id, user_question)
         else:
             # No good match found
             await update.message.reply_text(
@@ -1242,7 +1581,7 @@ Keep learning! Use /quiz to take another quiz."""
         """Handle text queries (non-command messages) - only for natural language questions"""
         # Ensure user is subscribed
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         text = update.message.text.strip()
         text_lower = text.lower()
@@ -1251,14 +1590,14 @@ Keep learning! Use /quiz to take another quiz."""
         # If they do, remind them to use buttons instead of typing
         active_quiz = None
         try:
-            active_quiz = get_quiz_session(user_id)
+            active_quiz = await asyncio.to_thread(get_quiz_session, user_id)
         except Exception as e:
             logger.error(f"Error getting quiz session from file for user {user_id}: {e}")
         
         # Fallback to in-memory storage if file storage failed
-        if not active_quiz and str(user_id) in self._in_memory_quizzes:
-            active_quiz = self._in_memory_quizzes[str(user_id)]
-            logger.info(f"Using in-memory quiz session for user {user_id}")
+        if not active_quiz and user_id in self._in_memory_quizzes:
+            active_quiz = self._in_memory_quizzes[user_id].to_dict()
+            logger.info("Using in-memory quiz session for user %s", user_id)
         
         if active_quiz and 'question_data' in active_quiz:
             # User has an active quiz - remind them to use buttons
@@ -1274,43 +1613,23 @@ Keep learning! Use /quiz to take another quiz."""
         # No active quiz - treat as a Bible question or query
         
         # Check for day number queries
-        day_match = re.search(r'\bday\s+(\d+)\b', text)
+        day_match = _DAY_RE.search(text_lower)
         if day_match:
             day_number = int(day_match.group(1))
             if 1 <= day_number <= DAYS_IN_YEAR:
-                # Reuse day_command logic
-                current_year = datetime.now().year
-                start_date = datetime(current_year, 1, 1)
-                target_date = start_date + timedelta(days=day_number - 1)
-                date_str = target_date.strftime("%B %d, %Y")
-                
-                reading = self.get_bible_reading(day_number)
-                encouragement = self.get_encouragement(day_number)
-                message = self.format_message(day_number, date_str, reading, encouragement)
-                
-                await update.message.reply_text(message, parse_mode='Markdown')
+                # Same message as /day
+                await update.message.reply_text(self.get_day_message(day_number), parse_mode='Markdown')
                 return
         
         # Check for "today" queries
-        if any(word in text for word in ['today', 'todays', "today's", 'current', 'now']):
-            day_number, date_str = self.get_day_of_year()
-            reading = self.get_bible_reading(day_number)
-            encouragement = self.get_encouragement(day_number)
-            message = self.format_message(day_number, date_str, reading, encouragement)
+        if _TODAY_RE.search(text_lower):
+            _, message = self.get_daily_message()
             await update.message.reply_text(message, parse_mode='Markdown')
             return
         
         # Check for daily challenge date queries
-        daily_challenge_patterns = [
-            r'daily\s+challenge.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # date format
-            r'challenge.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # challenge with date
-            r'daily.*?(\d{1,2}[/-]\d{1,2}[/-]\d{2,4})',  # daily with date
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}).*?challenge',  # date then challenge
-            r'(\d{1,2}[/-]\d{1,2}[/-]\d{2,4}).*?daily',  # date then daily
-        ]
-        
-        for pattern in daily_challenge_patterns:
-            match = re.search(pattern, text_lower)
+        for pattern in _DAILY_CHALLENGE_DATE_RES:
+            match = pattern.search(text_lower)
             if match:
                 date_str = match.group(1)
                 try:
@@ -1334,8 +1653,7 @@ Keep learning! Use /quiz to take another quiz."""
                             response = f"📅 *Daily Challenge for {parsed_date.strftime('%B %d, %Y')}*\n\n"
                             response += f"*Question:*\n{question['question']}\n\n"
                             response += "*Options:*\n"
-                            for i, opt in enumerate(question['options'], 1):
-                                response += f"{i}. {opt}\n"
+                            response += "".join(f"{i}. {opt}\n" for i, opt in enumerate(question['options'], 1))
                             response += f"\n*Correct Answer:* {question['options'][question['correct']]}\n"
                             response += f"*Reference:* {question['reference']}"
                             
@@ -1357,8 +1675,8 @@ Keep learning! Use /quiz to take another quiz."""
             from daily_quiz import get_today_quiz_question, has_completed_daily_quiz, get_daily_quiz_stats
             user_id = update.effective_user.id
             
-            if has_completed_daily_quiz(user_id):
-                stats = get_daily_quiz_stats(user_id)
+            if await asyncio.to_thread(has_completed_daily_quiz, user_id):
+                stats = await asyncio.to_thread(get_daily_quiz_stats, user_id)
                 await update.message.reply_text(
                     f"✅ *Daily Challenge Completed!*\n\n"
                     f"You've already completed today's challenge!\n\n"
@@ -1371,7 +1689,7 @@ Keep learning! Use /quiz to take another quiz."""
                     reply_markup=self.get_quick_actions_keyboard()
                 )
             else:
-                question = get_today_quiz_question()
+                question = await asyncio.to_thread(get_today_quiz_question)
                 response = f"⭐ *Daily Challenge Quiz!*\n\n"
                 response += f"*Today's Special Question:*\n{question['question']}\n\n"
                 response += "*Tap your answer below:*"
@@ -1406,14 +1724,27 @@ Keep learning! Use /quiz to take another quiz."""
                 reply_markup=self.get_main_menu_keyboard()
             )
     
-    async def send_daily_to_user(self, user_id):
-        """Send daily reading to a specific user"""
+    def get_day_message(self, day_number):
+        """Reading message for a day of the current year (formatted once and cached)"""
+        return _day_message(day_number, _get_day_cache()[3])
+    
+    def get_daily_message(self):
+        """
+        Today's daily reading message
+        Returns: (day_number, message)
+        """
+        day_number, _ = self.get_day_of_year()
+        return day_number, self.get_day_message(day_number)
+    
+    async def send_daily_to_user(self, user_id, message=None, retry=True, defer_removal=False):
+        """
+        Send daily reading to a specific user (message is built if not given)
+        With defer_removal, a user who blocked the bot is queued for _flush_removals
+        instead of being removed from storage right away
+        """
         try:
-            day_number, date_str = self.get_day_of_year()
-            reading = self.get_bible_reading(day_number)
-            encouragement = self.get_encouragement(day_number)
-            
-            message = self.format_message(day_number, date_str, reading, encouragement)
+            if message is None:
+                _, message = self.get_daily_message()
             
             await self.application.bot.send_message(
                 chat_id=user_id,
@@ -1421,14 +1752,26 @@ Keep learning! Use /quiz to take another quiz."""
                 parse_mode='Markdown'
             )
             
-            logger.info(f"Successfully sent daily reading to user {user_id}")
+            logger.info("Successfully sent daily reading to user %s", user_id)
             return True
             
         except Forbidden:
             # User blocked the bot - remove from subscriptions
             logger.warning(f"User {user_id} blocked the bot, removing from subscriptions")
-            remove_user(user_id)
+            if defer_removal:
+                self._pending_removals.add(user_id)
+            else:
+                await asyncio.to_thread(remove_user, user_id)
+            self._subscribed_cache.discard(user_id)
             return False
+        except RetryAfter as e:
+            # Flood control (likely during the concurrent broadcast) - wait as told and retry once
+            if not retry:
+                logger.error(f"Rate limited again sending to user {user_id}, giving up: {e}")
+                return False
+            logger.warning(f"Rate limited sending to user {user_id}, retrying in {e.retry_after}s")
+            await asyncio.sleep(e.retry_after)
+            return await self.send_daily_to_user(user_id, message, retry=False, defer_removal=defer_removal)
         except TelegramError as e:
             logger.error(f"Telegram error sending to user {user_id}: {e}")
             return False
@@ -1436,9 +1779,18 @@ Keep learning! Use /quiz to take another quiz."""
             logger.error(f"Error sending message to user {user_id}: {e}")
             return False
     
+    async def _flush_removals(self):
+        """Remove all queued blocked users from subscriptions in a single write"""
+        if not self._pending_removals:
+            return
+        user_ids = list(self._pending_removals)
+        self._pending_removals.clear()
+        removed = await asyncio.to_thread(remove_users, user_ids)
+        logger.info(f"Removed {removed} blocked users from subscriptions")
+    
     async def send_daily_to_all_subscribed(self):
         """Send daily reading to all subscribed users"""
-        users = get_all_subscribed_users()
+        users = await asyncio.to_thread(get_all_subscribed_users)
         
         if not users:
             logger.info("No subscribed users to send messages to")
@@ -1446,14 +1798,24 @@ Keep learning! Use /quiz to take another quiz."""
         
         logger.info(f"Sending daily reading to {len(users)} subscribed users")
         
-        success_count = 0
-        failed_users = []
-        for user_id in users:
-            if await self.send_daily_to_user(user_id):
-                success_count += 1
-            else:
-                failed_users.append(user_id)
-            await asyncio.sleep(0.1)  # Small delay to avoid rate limiting
+        # Build the message once and send concurrently. Each slot stays held for
+        # DAILY_BROADCAST_SLOT_DELAY after its send, capping the rate at roughly
+        # DAILY_BROADCAST_CONCURRENCY messages per second (Telegram allows ~30/s)
+        _, message = self.get_daily_message()
+        semaphore = asyncio.Semaphore(DAILY_BROADCAST_CONCURRENCY)
+        
+        async def send(user_id):
+            async with semaphore:
+                sent = await self.send_daily_to_user(user_id, message, defer_removal=True)
+                await asyncio.sleep(DAILY_BROADCAST_SLOT_DELAY)
+                return sent
+        
+        try:
+            results = await asyncio.gather(*(send(user_id) for user_id in users), return_exceptions=True)
+        finally:
+            await self._flush_removals()
+        success_count = sum(1 for result in results if result is True)
+        failed_users = [user_id for user_id, result in zip(users, results) if result is not True]
         
         logger.info(f"Successfully sent to {success_count}/{len(users)} users")
         if failed_users:
@@ -1464,11 +1826,11 @@ Keep learning! Use /quiz to take another quiz."""
     async def daily_quiz_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /daily_quiz command - take today's special quiz"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         # Check if already completed
-        if has_completed_daily_quiz(user_id):
-            stats = get_daily_quiz_stats(user_id)
+        if await asyncio.to_thread(has_completed_daily_quiz, user_id):
+            stats = await asyncio.to_thread(get_daily_quiz_stats, user_id)
             await update.message.reply_text(
                 f"✅ *Daily Challenge Completed!*\n\n"
                 f"You've already completed today's challenge!\n\n"
@@ -1483,37 +1845,24 @@ Keep learning! Use /quiz to take another quiz."""
             return
         
         # Get today's question
-        question = get_today_quiz_question()
+        question = await asyncio.to_thread(get_today_quiz_question)
         
         # Check if user has active quiz
-        active_quiz = get_quiz_session(user_id)
+        active_quiz = await asyncio.to_thread(get_quiz_session, user_id)
         if active_quiz:
             await update.message.reply_text(
-                "🎯 *You already have an active quiz!*\n\n"
-                f"Current score: {active_quiz['score']}/{active_quiz['total']}\n\n"
-                "Complete or stop your current quiz first.",
+                _ACTIVE_QUIZ_TEMPLATE.format(
+                    score=active_quiz['score'], total=active_quiz['total'], hint=_ACTIVE_QUIZ_HINT_FINISH
+                ),
                 parse_mode='Markdown',
                 reply_markup=self.get_quick_actions_keyboard()
             )
             return
         
         # Start daily quiz session
-        try:
-            start_quiz_session(user_id, 0, question, difficulty=question.get('difficulty'), category=question.get('category'))
-        except Exception as e:
-            logger.error(f"Error starting daily quiz session: {e}")
-        
-        user_id_str = str(user_id)
-        self._in_memory_quizzes[user_id_str] = {
-            'question_index': 0,
-            'question_data': question,
-            'score': 0,
-            'total': 0,
-            'started_at': None,
-            'difficulty': question.get('difficulty'),
-            'category': question.get('category'),
-            'is_daily_quiz': True  # Mark as daily quiz
-        }
+        self._begin_quiz_session(
+            user_id, question, difficulty=question.get('difficulty'), category=question.get('category'), is_daily_quiz=True
+        )
         
         # Escape HTML special characters in question text
         escaped_question = html.escape(question['question'])
@@ -1539,7 +1888,7 @@ Keep learning! Use /quiz to take another quiz."""
     async def verse_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /verse command - get verse of the day or specific verse"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         if not context.args:
             # Show verse of the day
@@ -1615,22 +1964,18 @@ Keep learning! Use /quiz to take another quiz."""
     async def achievements_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /achievements command - show user's achievements"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         # Check for new achievements
-        from reading_progress import get_user_progress
-        from quiz_storage import get_user_score
-        from daily_quiz import get_daily_quiz_stats
-        
-        reading_progress = get_user_progress(user_id)
-        quiz_stats = get_user_score(user_id)
-        daily_quiz_stats = get_daily_quiz_stats(user_id)
+        reading_progress = await asyncio.to_thread(get_user_progress, user_id)
+        quiz_stats = await asyncio.to_thread(get_user_score, user_id)
+        daily_quiz_stats = await asyncio.to_thread(get_daily_quiz_stats, user_id)
         
-        newly_unlocked = check_and_award_achievements(
+        newly_unlocked = await asyncio.to_thread(check_and_award_achievements,
             user_id, reading_progress, quiz_stats, daily_quiz_stats
         )
         
-        display = get_achievement_display(user_id)
+        display = await asyncio.to_thread(get_achievement_display, user_id)
         
         # Show notification if new achievements unlocked
         if newly_unlocked:
@@ -1651,45 +1996,12 @@ Keep learning! Use /quiz to take another quiz."""
     async def remind_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /remind command - set reading reminder"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         if not context.args:
             # Show current reminders
-            reminders = get_user_reminders(user_id)
-            if reminders['enabled'] and reminders['times']:
-                times_list = "\n".join([f"• {time}" for time in reminders['times']])
-                reminder_text = f"""⏰ *Your Reading Reminders*
-
-{MESSAGE_SEPARATOR}
-
-*Reminder Times:*
-{times_list}
-
-{MESSAGE_SEPARATOR}
-
-*To add a reminder:*
-/remind 8am
-/remind 14:30
-/remind 9:00pm
-
-*To remove a reminder:*
-/remind_off"""
-            else:
-                reminder_text = """⏰ *Reading Reminders*
-
-{MESSAGE_SEPARATOR}
-
-You don't have any reminders set.
-
-*Set a reminder:*
-/remind 8am
-/remind 14:30
-/remind 9:00pm
-
-*Examples:*
-• /remind 8am - Remind at 8:00 AM
-• /remind 14:30 - Remind at 2:30 PM
-• /remind 9:00pm - Remind at 9:00 PM"""
+            reminders = await asyncio.to_thread(get_user_reminders, user_id)
+            reminder_text = _reminders_text(reminders)
             
             await update.message.reply_text(
                 reminder_text,
@@ -1721,7 +2033,7 @@ You don't have any reminders set.
             )
             return
         
-        if set_reminder(user_id, hour, minute):
+        if await asyncio.to_thread(set_reminder, user_id, hour, minute):
             await update.message.reply_text(
                 f"✅ *Reminder Set!*\n\n"
                 f"You'll be reminded to read at {hour:02d}:{minute:02d} every day.\n\n"
@@ -1738,9 +2050,9 @@ You don't have any reminders set.
     async def remind_off_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /remind_off command - disable reminders"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
-        if disable_reminders(user_id):
+        if await asyncio.to_thread(disable_reminders, user_id):
             await update.message.reply_text(
                 "✅ *Reminders Disabled*\n\n"
                 "You won't receive reading reminders anymore.\n\n"
@@ -1758,7 +2070,7 @@ You don't have any reminders set.
         """Handle /test_daily command - manually test daily message sending"""
         # Ensure user is subscribed
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         await update.message.reply_text(
             "🔄 Testing daily message sending...\n\n"
@@ -1781,26 +2093,24 @@ You don't have any reminders set.
     async def progress_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /progress command - show reading progress"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
-        progress = get_user_progress(user_id)
-        current_streak = get_current_streak(user_id)
-        longest_streak = get_longest_streak(user_id)
         current_day, _ = self.get_day_of_year()
+        dashboard = await asyncio.to_thread(get_user_dashboard, user_id, current_day)
+        progress = dashboard['progress']
+        current_streak = dashboard['current_streak']
+        longest_streak = dashboard['longest_streak_all_time']
         
         # Calculate days remaining
-        total_days = 365
-        current_year = datetime.now().year
-        if current_year % 4 == 0 and (current_year % 100 != 0 or current_year % 400 == 0):
-            total_days = 366
+        current_year = _get_day_cache()[3]
+        total_days = _days_in_year(current_year)
         
         days_remaining = total_days - current_day
         days_completed = progress['total_completed']
         
         # Create progress bar (visual representation)
-        progress_bar_length = 20
-        filled = int((progress['completion_percentage'] / 100) * progress_bar_length)
-        progress_bar = "█" * filled + "░" * (progress_bar_length - filled)
+        filled = int((progress['completion_percentage'] / 100) * PROGRESS_BAR_LENGTH)
+        progress_bar = _PROGRESS_BARS[min(filled, PROGRESS_BAR_LENGTH)]
         
         progress_text = f"""📊 *Your Reading Progress*
 
@@ -1808,33 +2118,24 @@ You don't have any reminders set.
 {progress_bar}
 
 🔥 *Current Streak:* {current_streak} days
-🏆 *Longest Streak:* {longest_streak} days
-
-📅 *Today:* Day {current_day}
-⏳ *Days Remaining:* {days_remaining}
-
-💡 *Tip:* Use /today to read today's passage and automatically mark it as completed!
+🏆 *Longest Streak:* {longest_streak} days
 
-*Commands:*
-• /streak - View your reading streak
-• /stats - Detailed statistics
-• /completed [day] - Mark a specific day as completed"""
+📅 *Today:* Day {current_day}
+⏳ *Days Remaining:* {days_remaining}""" + _PROGRESS_FOOTER
         
         await update.message.reply_text(progress_text, parse_mode='Markdown')
     
     async def streak_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /streak command - show reading streak"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
-        current_streak = get_current_streak(user_id)
-        longest_streak_this_year = get_longest_streak(user_id, year=datetime.now().year)
-        longest_streak_all_time = get_longest_streak(user_id, year=None)  # All-time
-        progress = get_user_progress(user_id)
         current_day, _ = self.get_day_of_year()
-        
-        # Check if today is completed
-        today_completed = is_day_completed(user_id, current_day)
+        dashboard = await asyncio.to_thread(get_user_dashboard, user_id, current_day)
+        current_streak = dashboard['current_streak']
+        longest_streak_this_year = dashboard['longest_streak']
+        longest_streak_all_time = dashboard['longest_streak_all_time']
+        today_completed = dashboard['day_completed']
         
         streak_text = f"""🔥 *Your Reading Streak*
 
@@ -1842,14 +2143,7 @@ You don't have any reminders set.
 🏆 *Longest Streak (This Year):* {longest_streak_this_year} days
 🌟 *Longest Streak (All-Time):* {longest_streak_all_time} days
 
-{"✅ Today's reading is completed!" if today_completed else "⚠️ Don't forget to read today! Use /today"}
-        
-💪 *Keep it up!* Consistency is key to completing the Bible in a Year.
-
-*Commands:*
-• /progress - Full progress overview
-• /stats - Detailed statistics
-• /today - Read today's passage"""
+{"✅ Today's reading is completed!" if today_completed else "⚠️ Don't forget to read today! Use /today"}""" + _STREAK_FOOTER
         
         await update.message.reply_text(
             streak_text, 
@@ -1860,7 +2154,7 @@ You don't have any reminders set.
     async def completed_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /completed command - mark days as completed"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
         if not context.args:
             # Show help
@@ -1884,8 +2178,8 @@ You don't have any reminders set.
                 return
             
             # Mark as completed
-            if mark_day_completed(user_id, day_number):
-                is_already = is_day_completed(user_id, day_number)
+            if await asyncio.to_thread(mark_day_completed, user_id, day_number):
+                is_already = await asyncio.to_thread(is_day_completed, user_id, day_number)
                 if is_already:
                     await update.message.reply_text(
                         f"✅ Day {day_number} is already marked as completed!\n\n"
@@ -1909,18 +2203,17 @@ You don't have any reminders set.
     async def stats_command(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle /stats command - show detailed reading statistics"""
         user_id = update.effective_user.id
-        self._ensure_subscribed(user_id)
+        await self._ensure_subscribed(user_id)
         
-        progress = get_user_progress(user_id)
-        current_streak = get_current_streak(user_id)
-        longest_streak = get_longest_streak(user_id)
         current_day, date_str = self.get_day_of_year()
+        dashboard = await asyncio.to_thread(get_user_dashboard, user_id, current_day)
+        progress = dashboard['progress']
+        current_streak = dashboard['current_streak']
+        longest_streak = dashboard['longest_streak_all_time']
         
         # Calculate statistics
-        total_days = 365
-        current_year = datetime.now().year
-        if current_year % 4 == 0 and (current_year % 100 != 0 or current_year % 400 == 0):
-            total_days = 366
+        current_year = _get_day_cache()[3]
+        total_days = _days_in_year(current_year)
         
         days_remaining = total_days - current_day
         days_completed = progress['total_completed']
@@ -1947,17 +2240,7 @@ You don't have any reminders set.
 📅 *Current Status:*
 • Today: Day {current_day} ({date_str})
 • Last Completed: {last_completed_text}
-• Completion Rate: {completion_rate:.1f}% (of days so far)
-
-💡 *Tips:*
-• Read every day to maintain your streak!
-• Use /today to automatically mark today as completed
-• Use /progress for a visual progress bar
-
-*Commands:*
-• /progress - Visual progress overview
-• /streak - Streak information
-• /completed [day] - Mark a day as completed"""
+• Completion Rate: {completion_rate:.1f}% (of days so far)""" + _STATS_FOOTER
         
         await update.message.reply_text(
             stats_text, 
@@ -1986,8 +2269,7 @@ You don't have any reminders set.
                 # Try sending without parse_mode as fallback
                 try:
                     # Remove HTML tags for plain text fallback
-                    import re
-                    plain_text = re.sub(r'<[^>]+>', '', text)  # Remove HTML tags
+                    plain_text = _HTML_TAG_RE.sub('', text)  # Remove HTML tags
                     await query.message.reply_text(
                         plain_text,
                         reply_markup=reply_markup
@@ -2011,46 +2293,44 @@ You don't have any reminders set.
             raise
     
     # ==================== Callback Handler Methods ====================
-    # These methods handle specific groups of callbacks to keep handle_callback() manageable
-    
-    async def _handle_menu_callback(self, query, callback_data: str, user_id: int):
-        """Handle menu-related callbacks"""
-        logger.debug(f"_handle_menu_callback: {callback_data} for user {user_id}")
-        if callback_data == "menu_main":
-            await self.safe_edit_message(
-                query,
-                "📱 *Main Menu*\n\nChoose an option:",
-                parse_mode='Markdown',
-                reply_markup=self.get_main_menu_keyboard()
-            )
-        elif callback_data == "menu_today":
-            day_number, date_str = self.get_day_of_year()
-            reading = self.get_bible_reading(day_number)
-            encouragement = self.get_encouragement(day_number)
-            message = self.format_message(day_number, date_str, reading, encouragement)
-            mark_day_completed(user_id, day_number)
-            await self.safe_edit_message(query, 
-                message,
-                parse_mode='Markdown',
-                reply_markup=self.get_reading_menu_keyboard()
-            )
-        elif callback_data == "menu_progress":
-            from reading_progress import get_user_progress, get_current_streak, get_longest_streak
-            progress = get_user_progress(user_id)
-            current_streak = get_current_streak(user_id)
-            longest_streak_this_year = get_longest_streak(user_id, year=datetime.now().year)
-            longest_streak_all_time = get_longest_streak(user_id, year=None)
-            current_day, _ = self.get_day_of_year()
-            
-            current_year = datetime.now().year
-            is_leap_year = current_year % 4 == 0 and (current_year % 100 != 0 or current_year % 400 == 0)
-            total_days = DAYS_IN_LEAP_YEAR if is_leap_year else DAYS_IN_YEAR
-            
-            days_remaining = total_days - current_day
-            filled = int((progress['completion_percentage'] / 100) * PROGRESS_BAR_LENGTH)
-            progress_bar = "█" * filled + "░" * (PROGRESS_BAR_LENGTH - filled)
-            
-            progress_text = f"""📊 *Your Reading Progress*
+    # One method per callback_data value, registered in _callback_table
+    
+    async def _cb_menu_main(self, query, user_id: int):
+        """Show the main menu"""
+        await self.safe_edit_message(
+            query,
+            _MAIN_MENU_TEXT,
+            parse_mode='Markdown',
+            reply_markup=self.get_main_menu_keyboard()
+        )
+    
+    async def _cb_menu_today(self, query, user_id: int):
+        """Send today's reading and mark it completed"""
+        day_number, message = self.get_daily_message()
+        await asyncio.to_thread(mark_day_completed, user_id, day_number)
+        await self.safe_edit_message(query, 
+            message,
+            parse_mode='Markdown',
+            reply_markup=self.get_reading_menu_keyboard()
+        )
+    
+    async def _cb_menu_progress(self, query, user_id: int):
+        """Show the reading progress overview"""
+        current_day, _ = self.get_day_of_year()
+        dashboard = await asyncio.to_thread(get_user_dashboard, user_id, current_day)
+        progress = dashboard['progress']
+        current_streak = dashboard['current_streak']
+        longest_streak_this_year = dashboard['longest_streak']
+        longest_streak_all_time = dashboard['longest_streak_all_time']
+        
+        current_year = _get_day_cache()[3]
+        total_days = _days_in_year(current_year)
+        
+        days_remaining = total_days - current_day
+        filled = int((progress['completion_percentage'] / 100) * PROGRESS_BAR_LENGTH)
+        progress_bar = _PROGRESS_BARS[min(filled, PROGRESS_BAR_LENGTH)]
+        
+        progress_text = f"""📊 *Your Reading Progress*
 
 📖 *Completion:* {progress['total_completed']}/{total_days} days ({progress['completion_percentage']:.1f}%)
 {progress_bar}
@@ -2061,173 +2341,107 @@ You don't have any reminders set.
 
 📅 *Today:* Day {current_day}
 ⏳ *Days Remaining:* {days_remaining}"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🔥 View Streak", callback_data="menu_streak")],
-                [InlineKeyboardButton("📈 Detailed Stats", callback_data="menu_stats")],
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
-            await self.safe_edit_message(query, 
-                progress_text,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
-        elif callback_data == "menu_streak":
-            from reading_progress import get_current_streak, get_longest_streak, is_day_completed
-            current_streak = get_current_streak(user_id)
-            longest_streak_this_year = get_longest_streak(user_id, year=datetime.now().year)
-            longest_streak_all_time = get_longest_streak(user_id, year=None)
-            current_day, _ = self.get_day_of_year()
-            today_completed = is_day_completed(user_id, current_day)
-            
-            today_status = "✅ Today's reading is completed!" if today_completed else "⚠️ Don't forget to read today! Use /today"
-            
-            streak_text = f"""🔥 *Your Reading Streak*
+        
+        await self.safe_edit_message(query, 
+            progress_text,
+            parse_mode='Markdown',
+            reply_markup=self._progress_screen_keyboard
+        )
+    
+    async def _cb_menu_streak(self, query, user_id: int):
+        """Show the reading streak"""
+        current_day, _ = self.get_day_of_year()
+        dashboard = await asyncio.to_thread(get_user_dashboard, user_id, current_day)
+        current_streak = dashboard['current_streak']
+        longest_streak_this_year = dashboard['longest_streak']
+        longest_streak_all_time = dashboard['longest_streak_all_time']
+        today_completed = dashboard['day_completed']
+        
+        today_status = "✅ Today's reading is completed!" if today_completed else "⚠️ Don't forget to read today! Use /today"
+        
+        streak_text = f"""🔥 *Your Reading Streak*
 
 📅 *Current Streak:* {current_streak} days
 🏆 *Longest Streak \\(This Year\\):* {longest_streak_this_year} days
 🌟 *Longest Streak \\(All-Time\\):* {longest_streak_all_time} days
 
-{today_status}
+{today_status}""" + _STREAK_MENU_FOOTER
         
-💪 *Keep it up!* Consistency is key."""
-            
-            keyboard = [
-                [InlineKeyboardButton("📊 View Progress", callback_data="menu_progress")],
-                [InlineKeyboardButton("📖 Read Today", callback_data="menu_today")],
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
+        await self.safe_edit_message(query, 
+            streak_text,
+            parse_mode='Markdown',
+            reply_markup=self._streak_screen_keyboard
+        )
+    
+    async def _cb_menu_quiz(self, query, user_id: int):
+        """Show the quiz difficulty menu"""
+        try:
             await self.safe_edit_message(query, 
-                streak_text,
+                _QUIZ_MENU_TEXT,
                 parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=self.get_quiz_menu_keyboard()
             )
-        elif callback_data == "menu_quiz":
+            logger.info("Successfully handled menu_quiz callback for user %s", user_id)
+        except Exception as e:
+            logger.error(f"Error in menu_quiz handler for user {user_id}: {e}", exc_info=True)
+            # Try to send error message
             try:
-                quiz_text = f"""🎯 *Bible Quiz*
-
-Choose your difficulty level:
-• 🟢 Easy - Beginner questions
-• 🟡 Medium - Intermediate questions  
-• 🔴 Hard - Advanced questions
-• 🎲 Random - Mixed difficulty
-
-*{TOTAL_QUIZ_QUESTIONS}+ questions covering all 66 books of the Bible!*"""
-                
-                await self.safe_edit_message(query, 
-                    quiz_text,
-                    parse_mode='Markdown',
-                    reply_markup=self.get_quiz_menu_keyboard()
+                await query.message.reply_text(
+                    f"❌ Error loading quiz menu. Please try again.",
+                    reply_markup=self.get_main_menu_keyboard()
                 )
-                logger.info(f"Successfully handled menu_quiz callback for user {user_id}")
-            except Exception as e:
-                logger.error(f"Error in menu_quiz handler for user {user_id}: {e}", exc_info=True)
-                # Try to send error message
-                try:
-                    await query.message.reply_text(
-                        f"❌ Error loading quiz menu. Please try again.",
-                        reply_markup=self.get_main_menu_keyboard()
-                    )
-                except:
-                    pass
-        elif callback_data == "menu_help":
-            help_text = f"""📖 *Bible in a Year Bot - Help*
-
-{MESSAGE_SEPARATOR}
-
-*🎯 Main Features:*
-Everything is button-based! Just tap the buttons to interact.
-
-*📚 Reading:*
-• /today - Get today's Bible reading
-• /day [number] - Get reading for a specific day
-• /search [book] - Search for a Bible book
-
-*🎯 Quiz:*
-• /quiz - Start a random Bible quiz
-• /daily_quiz - Take today's special challenge
-• /score - View your statistics
-• /leaderboard - See top players
-
-*⭐ New Features:*
-• /verse - Get verse of the day
-• /achievements - View your badges
-• /remind [time] - Set reading reminders
-
-{MESSAGE_SEPARATOR}
-
-*Use the buttons below to navigate!*"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
+            except:
+                pass
+    
+    async def _cb_menu_help(self, query, user_id: int):
+        """Show the button-based help screen"""
+        await self.safe_edit_message(query, 
+            _HELP_MENU_TEXT,
+            parse_mode='Markdown',
+            reply_markup=self.get_back_to_menu_keyboard()
+        )
+    
+    async def _cb_menu_daily_quiz(self, query, user_id: int):
+        """Start today's daily challenge (or show its stats if already completed)"""
+        # Check if already completed
+        if await asyncio.to_thread(has_completed_daily_quiz, user_id):
+            stats = await asyncio.to_thread(get_daily_quiz_stats, user_id)
+            await self.safe_edit_message(query, 
+                f"✅ *Daily Challenge Completed!*\n\n"
+                f"You've already completed today's challenge!\n\n"
+                f"*Your Daily Challenge Stats:*\n"
+                f"• Total Completed: {stats['total_completed']}\n"
+                f"• Current Streak: {stats['current_streak']} days\n"
+                f"• Best Score: {stats['best_score']:.1f}%\n\n"
+                f"Come back tomorrow for a new challenge!",
+                parse_mode='Markdown',
+                reply_markup=self.get_quick_actions_keyboard()
+            )
+            return
+        
+        # Get today's question
+        question = await asyncio.to_thread(get_today_quiz_question)
+        
+        # Check if user has active quiz
+        active_quiz = await asyncio.to_thread(get_quiz_session, user_id)
+        if active_quiz:
             await self.safe_edit_message(query, 
-                help_text,
+                _ACTIVE_QUIZ_TEMPLATE.format(
+                    score=active_quiz['score'], total=active_quiz['total'], hint=_ACTIVE_QUIZ_HINT_FINISH
+                ),
                 parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=self.get_quick_actions_keyboard()
             )
-        else:
-            # Route to other menu handlers
-            await self._handle_other_menu_callbacks(query, callback_data, user_id)
-    
-    async def _handle_other_menu_callbacks(self, query, callback_data: str, user_id: int):
-        """Handle additional menu callbacks (daily_quiz, verse, achievements, reminders, leaderboard, score, stats, ask, search)"""
-        if callback_data == "menu_daily_quiz":
-            # Check if already completed
-            if has_completed_daily_quiz(user_id):
-                stats = get_daily_quiz_stats(user_id)
-                await self.safe_edit_message(query, 
-                    f"✅ *Daily Challenge Completed!*\n\n"
-                    f"You've already completed today's challenge!\n\n"
-                    f"*Your Daily Challenge Stats:*\n"
-                    f"• Total Completed: {stats['total_completed']}\n"
-                    f"• Current Streak: {stats['current_streak']} days\n"
-                    f"• Best Score: {stats['best_score']:.1f}%\n\n"
-                    f"Come back tomorrow for a new challenge!",
-                    parse_mode='Markdown',
-                    reply_markup=self.get_quick_actions_keyboard()
-                )
-                return
-            
-            # Get today's question
-            question = get_today_quiz_question()
-            
-            # Check if user has active quiz
-            active_quiz = get_quiz_session(user_id)
-            if active_quiz:
-                await self.safe_edit_message(query, 
-                    "🎯 *You already have an active quiz!*\n\n"
-                    f"Current score: {active_quiz['score']}/{active_quiz['total']}\n\n"
-                    "Complete or stop your current quiz first.",
-                    parse_mode='Markdown',
-                    reply_markup=self.get_quick_actions_keyboard()
-                )
-                return
-            
-            # Start daily quiz session
-            try:
-                start_quiz_session(user_id, 0, question, difficulty=question.get('difficulty'), category=question.get('category'))
-            except Exception as e:
-                logger.error(f"Error starting daily quiz session: {e}")
-            
-            user_id_str = str(user_id)
-            self._in_memory_quizzes[user_id_str] = {
-                'question_index': 0,
-                'question_data': question,
-                'score': 0,
-                'total': 0,
-                'started_at': None,
-                'difficulty': question.get('difficulty'),
-                'category': question.get('category'),
-                'is_daily_quiz': True
-            }
-            
-            # Escape HTML special characters in question text
-            escaped_question = html.escape(question['question'])
-            quiz_message = f"""⭐ <b>Daily Challenge Quiz!</b>
+            return
+        
+        # Start daily quiz session
+        self._begin_quiz_session(
+            user_id, question, difficulty=question.get('difficulty'), category=question.get('category'), is_daily_quiz=True
+        )
+        
+        # Escape HTML special characters in question text
+        escaped_question = html.escape(question['question'])
+        quiz_message = f"""⭐ <b>Daily Challenge Quiz!</b>
 
 {MESSAGE_SEPARATOR}
 
@@ -2239,16 +2453,17 @@ Everything is button-based! Just tap the buttons to interact.
 <b>Tap your answer below:</b>
 
 💡 <i>Complete today's challenge to earn points and maintain your streak!</i>"""
-            
-            await self.safe_edit_message(query, 
-                quiz_message,
-                parse_mode='HTML',
-                reply_markup=self.get_quiz_answer_keyboard(question)
-            )
         
-        elif callback_data == "menu_verse":
-            verse_data = get_verse_of_the_day()
-            verse_text = f"""📖 <b>Verse of the Day</b>
+        await self.safe_edit_message(query, 
+            quiz_message,
+            parse_mode='HTML',
+            reply_markup=self.get_quiz_answer_keyboard(question)
+        )
+    
+    async def _cb_menu_verse(self, query, user_id: int):
+        """Show the verse of the day"""
+        verse_data = get_verse_of_the_day()
+        verse_text = f"""📖 <b>Verse of the Day</b>
 
 {MESSAGE_SEPARATOR}
 
@@ -2262,152 +2477,95 @@ Everything is button-based! Just tap the buttons to interact.
 
 *Use /verse [reference] to get a specific verse*
 *Example: /verse John 3:16*"""
-            
-            await self.safe_edit_message(query, 
-                verse_text,
-                parse_mode='HTML',
-                reply_markup=self.get_verse_keyboard()
-            )
         
-        elif callback_data == "menu_achievements":
-            # Check for new achievements
-            from reading_progress import get_user_progress
-            from quiz_storage import get_user_score
-            from daily_quiz import get_daily_quiz_stats
-            
-            reading_progress = get_user_progress(user_id)
-            quiz_stats = get_user_score(user_id)
-            daily_quiz_stats = get_daily_quiz_stats(user_id)
-            
-            newly_unlocked = check_and_award_achievements(
-                user_id, reading_progress, quiz_stats, daily_quiz_stats
-            )
-            
-            display = get_achievement_display(user_id)
-            
-            # Show notification if new achievements unlocked
-            if newly_unlocked:
-                notification = "🎉 *New Achievement Unlocked!*\n\n"
-                for achievement_id in newly_unlocked:
-                    achievement = ACHIEVEMENTS[achievement_id]
-                    notification += f"{achievement['emoji']} *{achievement['name']}*\n"
-                    notification += f"   {achievement['description']}\n\n"
-                notification += f"{MESSAGE_SEPARATOR}\n\n"
-                display = notification + display
-            
-            keyboard = [
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
-            await self.safe_edit_message(query, 
-                display,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
+        await self.safe_edit_message(query, 
+            verse_text,
+            parse_mode='HTML',
+            reply_markup=self.get_verse_keyboard()
+        )
+    
+    async def _cb_menu_achievements(self, query, user_id: int):
+        """Award any newly earned achievements and show the achievement list"""
+        # Check for new achievements
+        reading_progress = await asyncio.to_thread(get_user_progress, user_id)
+        quiz_stats = await asyncio.to_thread(get_user_score, user_id)
+        daily_quiz_stats = await asyncio.to_thread(get_daily_quiz_stats, user_id)
         
-        elif callback_data == "menu_reminders":
-            reminders = get_user_reminders(user_id)
-            if reminders['enabled'] and reminders['times']:
-                times_list = "\n".join([f"• {time}" for time in reminders['times']])
-                reminder_text = f"""⏰ *Your Reading Reminders*
-
-{MESSAGE_SEPARATOR}
-
-*Reminder Times:*
-{times_list}
-
-{MESSAGE_SEPARATOR}
-
-*To add a reminder:*
-/remind 8am
-/remind 14:30
-/remind 9:00pm
-
-*To remove a reminder:*
-/remind_off"""
-            else:
-                reminder_text = f"""⏰ *Reading Reminders*
-
-{MESSAGE_SEPARATOR}
-
-You don't have any reminders set.
-
-*Set a reminder:*
-/remind 8am
-/remind 14:30
-/remind 9:00pm
-
-*Examples:*
-• /remind 8am - Remind at 8:00 AM
-• /remind 14:30 - Remind at 2:30 PM
-• /remind 9:00pm - Remind at 9:00 PM"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
-            await self.safe_edit_message(query, 
-                reminder_text,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
+        newly_unlocked = await asyncio.to_thread(check_and_award_achievements,
+            user_id, reading_progress, quiz_stats, daily_quiz_stats
+        )
+        
+        display = await asyncio.to_thread(get_achievement_display, user_id)
+        
+        # Show notification if new achievements unlocked
+        if newly_unlocked:
+            notification = "🎉 *New Achievement Unlocked!*\n\n"
+            for achievement_id in newly_unlocked:
+                achievement = ACHIEVEMENTS[achievement_id]
+                notification += f"{achievement['emoji']} *{achievement['name']}*\n"
+                notification += f"   {achievement['description']}\n\n"
+            notification += f"{MESSAGE_SEPARATOR}\n\n"
+            display = notification + display
         
-        elif callback_data == "menu_leaderboard":
-            leaderboard = get_leaderboard(limit=LEADERBOARD_TOP_N)
-            user_rank, total_players = get_user_rank(user_id)
-            
-            if not leaderboard:
-                leaderboard_text = "📈 *Leaderboard*\n\nNo players yet. Be the first!"
+        await self.safe_edit_message(query, 
+            display,
+            parse_mode='Markdown',
+            reply_markup=self.get_back_to_menu_keyboard()
+        )
+    
+    async def _cb_menu_reminders(self, query, user_id: int):
+        """Show the user's reading reminders"""
+        reminders = await asyncio.to_thread(get_user_reminders, user_id)
+        
+        await self.safe_edit_message(query, 
+            _reminders_text(reminders),
+            parse_mode='Markdown',
+            reply_markup=self.get_back_to_menu_keyboard()
+        )
+    
+    async def _cb_menu_leaderboard(self, query, user_id: int):
+        """Show the top players and the user's rank"""
+        leaderboard, user_rank, _, total_players = await asyncio.to_thread(get_leaderboard_and_rank, user_id, limit=LEADERBOARD_TOP_N)
+        
+        if not leaderboard:
+            leaderboard_text = "📈 *Leaderboard*\n\nNo players yet. Be the first!"
+        else:
+            leaderboard_text = "📈 *Top 10 Players*\n\n"
+            leaderboard_text += f"{MESSAGE_SEPARATOR}\n\n"
+            
+            rows = []
+            for i, player in enumerate(leaderboard):
+                medal = _RANK_LABELS[i]
+                name = player.get('first_name') or player.get('username') or f"User {player['user_id']}"
+                best_score = player.get('best_score', 0)
+                total_correct = player.get('total_correct', 0)
+                rows.append(f"{medal} {name}\n   Best: {best_score:.1f}% | Correct: {total_correct}\n\n")
+            leaderboard_text += "".join(rows)
+            
+            leaderboard_text += f"{MESSAGE_SEPARATOR}\n\n"
+            if user_rank:
+                leaderboard_text += f"*Your Rank:* #{user_rank} of {total_players} players"
             else:
-                leaderboard_text = "📈 *Top 10 Players*\n\n"
-                leaderboard_text += f"{MESSAGE_SEPARATOR}\n\n"
-                
-                medals = ["🥇", "🥈", "🥉"]
-                for i, player in enumerate(leaderboard):
-                    medal = medals[i] if i < 3 else f"{i+1}."
-                    name = player.get('first_name') or player.get('username') or f"User {player['user_id']}"
-                    best_score = player.get('best_score', 0)
-                    total_correct = player.get('total_correct', 0)
-                    leaderboard_text += f"{medal} {name}\n"
-                    leaderboard_text += f"   Best: {best_score:.1f}% | Correct: {total_correct}\n\n"
-                
-                leaderboard_text += f"{MESSAGE_SEPARATOR}\n\n"
-                if user_rank:
-                    leaderboard_text += f"*Your Rank:* #{user_rank} of {total_players} players"
-                else:
-                    leaderboard_text += f"*Total Players:* {total_players}"
-            
-            keyboard = [
-                [InlineKeyboardButton("📊 My Score", callback_data="menu_score")],
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
-            await self.safe_edit_message(query, 
-                leaderboard_text,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
+                leaderboard_text += f"*Total Players:* {total_players}"
+        
+        await self.safe_edit_message(query, 
+            leaderboard_text,
+            parse_mode='Markdown',
+            reply_markup=self._leaderboard_screen_keyboard
+        )
+    
+    async def _cb_menu_score(self, query, user_id: int):
+        """Show the user's quiz statistics"""
+        score = await asyncio.to_thread(get_user_score, user_id)
         
-        elif callback_data == "menu_score":
-            score = get_user_score(user_id)
-            rank, total_players = get_user_rank(user_id)
+        if score['total_answered'] == 0:
+            score_text = _NO_SCORE_MENU_TEXT
+        else:
+            rank, total_players = await asyncio.to_thread(get_user_rank, user_id)
+            accuracy = (score['total_correct'] / score['total_answered'] * 100) if score['total_answered'] > 0 else 0
+            rank_text = f"#{rank} of {total_players}" if rank else "Not ranked"
             
-            if score['total_answered'] == 0:
-                score_text = f"""📊 *Your Quiz Score*
-
-{MESSAGE_SEPARATOR}
-
-You haven't answered any questions yet!
-
-*Start a quiz to begin earning points:*
-• Tap '🎯 Start Quiz' to begin
-• Complete daily challenges
-• Climb the leaderboard!"""
-            else:
-                accuracy = (score['total_correct'] / score['total_answered'] * 100) if score['total_answered'] > 0 else 0
-                rank_text = f"#{rank} of {total_players}" if rank else "Not ranked"
-                
-                score_text = f"""📊 *Your Quiz Statistics*
+            score_text = f"""📊 *Your Quiz Statistics*
 
 {MESSAGE_SEPARATOR}
 
@@ -2426,34 +2584,29 @@ You haven't answered any questions yet!
 {MESSAGE_SEPARATOR}
 
 💪 *Keep practicing to improve your score!*"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🎯 Start Quiz", callback_data="menu_quiz")],
-                [InlineKeyboardButton("📈 Leaderboard", callback_data="menu_leaderboard")],
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
-            await self.safe_edit_message(query, 
-                score_text,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
         
-        elif callback_data == "menu_stats":
-            progress = get_user_progress(user_id)
-            current_streak = get_current_streak(user_id)
-            longest_streak = get_longest_streak(user_id)
-            current_day, date_str = self.get_day_of_year()
-            
-            current_year = datetime.now().year
-            is_leap_year = current_year % 4 == 0 and (current_year % 100 != 0 or current_year % 400 == 0)
-            total_days = DAYS_IN_LEAP_YEAR if is_leap_year else DAYS_IN_YEAR
-            
-            days_completed = progress['total_completed']
-            days_remaining = total_days - current_day
-            completion_rate = (days_completed / current_day * 100) if current_day > 0 else 0
-            
-            stats_text = f"""📊 *Detailed Reading Statistics*
+        await self.safe_edit_message(query, 
+            score_text,
+            parse_mode='Markdown',
+            reply_markup=self._score_screen_keyboard
+        )
+    
+    async def _cb_menu_stats(self, query, user_id: int):
+        """Show detailed reading statistics"""
+        current_day, date_str = self.get_day_of_year()
+        dashboard = await asyncio.to_thread(get_user_dashboard, user_id, current_day)
+        progress = dashboard['progress']
+        current_streak = dashboard['current_streak']
+        longest_streak = dashboard['longest_streak_all_time']
+        
+        current_year = _get_day_cache()[3]
+        total_days = _days_in_year(current_year)
+        
+        days_completed = progress['total_completed']
+        days_remaining = total_days - current_day
+        completion_rate = (days_completed / current_day * 100) if current_day > 0 else 0
+        
+        stats_text = f"""📊 *Detailed Reading Statistics*
 
 {MESSAGE_SEPARATOR}
 
@@ -2472,151 +2625,76 @@ You haven't answered any questions yet!
 
 📅 *Current Status:*
 • Today: Day {current_day} ({date_str})
-• Completion Rate: {completion_rate:.1f}% (of days so far)
-
-{MESSAGE_SEPARATOR}
-
-💡 *Tips:*
-• Read every day to maintain your streak!
-• Use /today to automatically mark today as completed"""
-            
-            keyboard = [
-                [InlineKeyboardButton("📊 Progress", callback_data="menu_progress")],
-                [InlineKeyboardButton("🔥 Streak", callback_data="menu_streak")],
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
-            await self.safe_edit_message(query, 
-                stats_text,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
+• Completion Rate: {completion_rate:.1f}% (of days so far)""" + _STATS_MENU_FOOTER
         
-        elif callback_data == "menu_ask":
-            topics = get_all_topics()
-            topics_list = "\n".join([f"• {topic}" for topic in topics[:10]])
-            ask_text = f"""❓ *Ask a Bible Question*
-
-{MESSAGE_SEPARATOR}
-
-Type your question or use these common questions:
-
-*Examples:*
-• How can I be saved?
-• What does the Bible say about love?
-• How should I pray?
-
-{MESSAGE_SEPARATOR}
-
-*Topics I can help with:*
-{topics_list}
-... and more!
-
-{MESSAGE_SEPARATOR}
-
-*Type your question or use /ask [question]*"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
+        await self.safe_edit_message(query, 
+            stats_text,
+            parse_mode='Markdown',
+            reply_markup=self.get_progress_navigation_keyboard()
+        )
+    
+    async def _cb_menu_ask(self, query, user_id: int):
+        """Show the ask-a-question prompt"""
+        await self.safe_edit_message(query, 
+            _ask_menu_text(),
+            parse_mode='Markdown',
+            reply_markup=self.get_back_to_menu_keyboard()
+        )
+    
+    async def _cb_menu_search(self, query, user_id: int):
+        """Show the reading plan search prompt"""
+        await self.safe_edit_message(query, 
+            _SEARCH_MENU_TEXT,
+            parse_mode='Markdown',
+            reply_markup=self.get_back_to_menu_keyboard()
+        )
+    
+    async def _cb_reading_today(self, query, user_id: int):
+        """Send today's reading from the reading menu and mark it completed"""
+        day_number, message = self.get_daily_message()
+        await asyncio.to_thread(mark_day_completed, user_id, day_number)
+        await self.safe_edit_message(query, 
+            message,
+            parse_mode='Markdown',
+            reply_markup=self.get_reading_menu_keyboard()
+        )
+    
+    async def _cb_reading_pick(self, query, user_id: int):
+        """Prompt for a day number"""
+        await self.safe_edit_message(query, 
+            "📅 *Pick a Day*\n\n"
+            "Type a day number (1-365) or use:\n"
+            "/day [number]\n\n"
+            "*Example:* /day 45",
+            parse_mode='Markdown',
+            reply_markup=self.get_reading_menu_keyboard()
+        )
+    
+    async def _cb_start_quiz(self, difficulty, query, user_id: int):
+        """Start a quiz with the given difficulty (None for random)"""
+        active_quiz = await asyncio.to_thread(get_quiz_session, user_id)
+        if active_quiz:
             await self.safe_edit_message(query, 
-                ask_text,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                _ACTIVE_QUIZ_TEMPLATE.format(
+                    score=active_quiz['score'], total=active_quiz['total'], hint=_ACTIVE_QUIZ_HINT_ANSWER
+                ),
+                parse_mode='Markdown'
             )
+            return
         
-        elif callback_data == "menu_search":
-            search_text = f"""📚 *Search Reading Plan*
-
-{MESSAGE_SEPARATOR}
-
-Type the name of a Bible book to find which days include it.
-
-*Examples:*
-• Genesis
-• Matthew
-• Psalms
-
-{MESSAGE_SEPARATOR}
-
-*Type a book name or use /search [book]*"""
-            
-            keyboard = [
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
-            await self.safe_edit_message(query, 
-                search_text,
-                parse_mode='Markdown',
-                reply_markup=InlineKeyboardMarkup(keyboard)
-            )
+        recent_indices = self._recent_questions.get(user_id)
+        question = get_random_question(difficulty=difficulty, exclude_indices=recent_indices)
         
-        else:
-            # Unknown menu callback - return to main menu
-            await self.safe_edit_message(query, 
-                "📱 *Main Menu*\n\nChoose an option:",
-                parse_mode='Markdown',
-                reply_markup=self.get_main_menu_keyboard()
-            )
-    
-    async def _handle_quiz_callback(self, query, callback_data: str, user_id: int):
-        """Handle quiz-related callbacks (quiz start, quiz answers, quiz stop)"""
-        if callback_data in ["quiz_easy", "quiz_medium", "quiz_hard", "quiz_random"]:
-            # Start quiz based on difficulty
-            active_quiz = get_quiz_session(user_id)
-            if active_quiz:
-                await self.safe_edit_message(query, 
-                    f"🎯 *You already have an active quiz!*\n\n"
-                    f"Current score: {active_quiz['score']}/{active_quiz['total']}\n\n"
-                    f"{ERROR_MESSAGE_QUIZ_ACTIVE}",
-                    parse_mode='Markdown'
-                )
-                return
-            
-            difficulty = None
-            if callback_data == "quiz_easy":
-                difficulty = "easy"
-            elif callback_data == "quiz_medium":
-                difficulty = "medium"
-            elif callback_data == "quiz_hard":
-                difficulty = "hard"
-            # quiz_random keeps difficulty as None
-            
-            from quiz_questions import get_question_index
-            recent_indices = self._recent_questions.get(str(user_id), [])
-            question = get_random_question(difficulty=difficulty, exclude_indices=recent_indices)
-            
-            # Track this question to avoid repeats
-            question_index = get_question_index(question)
-            if question_index is not None:
-                if str(user_id) not in self._recent_questions:
-                    self._recent_questions[str(user_id)] = []
-                self._recent_questions[str(user_id)].append(question_index)
-                if len(self._recent_questions[str(user_id)]) > MAX_RECENT_QUESTIONS:
-                    self._recent_questions[str(user_id)] = self._recent_questions[str(user_id)][-MAX_RECENT_QUESTIONS:]
-            
-            try:
-                start_quiz_session(user_id, 0, question, difficulty=difficulty, category=None)
-            except Exception as e:
-                logger.error(f"Error starting quiz session: {e}")
-            
-            user_id_str = str(user_id)
-            self._in_memory_quizzes[user_id_str] = {
-                'question_index': 0,
-                'question_data': question,
-                'score': 0,
-                'total': 0,
-                'started_at': None,
-                'difficulty': difficulty,
-                'category': None
-            }
-            
-            diff_name = difficulty.title() if difficulty else "Random"
-            # Escape HTML special characters in question text and diff_name
-            escaped_question = html.escape(question['question'])
-            escaped_diff_name = html.escape(diff_name)
-            quiz_message = f"""🎯 <b>{escaped_diff_name} Bible Quiz Started!</b>
+        # Track this question to avoid repeats
+        self._remember_question(user_id, question)
+        
+        self._begin_quiz_session(user_id, question, difficulty=difficulty, category=None)
+        
+        diff_name = _DIFFICULTY_TITLES.get(difficulty, "Random")
+        # Escape HTML special characters in question text and diff_name
+        escaped_question = html.escape(question['question'])
+        escaped_diff_name = html.escape(diff_name)
+        quiz_message = f"""🎯 <b>{escaped_diff_name} Bible Quiz Started!</b>
 
 {MESSAGE_SEPARATOR}
 
@@ -2626,97 +2704,77 @@ Type the name of a Bible book to find which days include it.
 {MESSAGE_SEPARATOR}
 
 <b>Tap your answer below:</b>"""
+        
+        # Log message for debugging (first 200 chars, sliced only when debug is on)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Quiz message preview (first 200 chars): %s", quiz_message[:200])
+        
+        await self.safe_edit_message(query, 
+            quiz_message, 
+            parse_mode='HTML',
+            reply_markup=self.get_quiz_answer_keyboard(question)
+        )
+    
+    async def _cb_quiz_stop(self, query, user_id: int):
+        """End the active quiz from the inline button and record its score"""
+        session = None
+        if user_id in self._in_memory_quizzes:
+            session = self._in_memory_quizzes.pop(user_id).to_dict()
+        
+        if not session:
+            session = await asyncio.to_thread(end_quiz_session, user_id)
+        
+        if session and session['total'] > 0:
+            user = query.from_user
+            if await asyncio.to_thread(update_user_score,
+                user_id, 
+                session['score'], 
+                session['total'],
+                **self._user_name_kwargs(user)
+            ):
+                self._mark_names_stored(user)
+            accuracy = (session['score'] / session['total'] * 100) if session['total'] > 0 else 0
             
-            # Log message for debugging (first 200 chars)
-            logger.debug(f"Quiz message preview (first 200 chars): {quiz_message[:200]}")
+            is_daily_quiz = session.get('is_daily_quiz', False)
+            if is_daily_quiz:
+                await asyncio.to_thread(mark_daily_quiz_completed, user_id, session['score'], session['total'])
+                newly_unlocked = await asyncio.to_thread(check_and_award_achievements, user_id)
+                message = f"✅ *Daily Challenge Completed!*\n\n"
+                message += f"Final Score: {session['score']}/{session['total']} ({accuracy:.1f}%)\n\n"
+                if newly_unlocked:
+                    message += "🎉 *New Achievement Unlocked!*\n\n"
+                    message += _achievement_lines(newly_unlocked)
+                    message += "\n"
+                message += "Come back tomorrow for a new challenge!"
+            else:
+                message = f"✅ *Quiz Ended*\n\n"
+                message += f"Final Score: {session['score']}/{session['total']} ({accuracy:.1f}%)\n\n"
+                message += "Tap '🎯 Start Quiz' to start a new quiz!"
             
             await self.safe_edit_message(query, 
-                quiz_message, 
-                parse_mode='HTML',
-                reply_markup=self.get_quiz_answer_keyboard(question)
+                message,
+                parse_mode='Markdown',
+                reply_markup=self._quiz_ended_keyboard
             )
-        
-        elif callback_data == "quiz_stop":
-            # Handle quiz stop from inline button
-            session = None
-            if str(user_id) in self._in_memory_quizzes:
-                session = self._in_memory_quizzes[str(user_id)]
-                del self._in_memory_quizzes[str(user_id)]
-            
-            if not session:
-                session = end_quiz_session(user_id)
-            
-            if session and session['total'] > 0:
-                user = query.from_user
-                update_user_score(
-                    user_id, 
-                    session['score'], 
-                    session['total'],
-                    username=user.username,
-                    first_name=user.first_name
-                )
-                accuracy = (session['score'] / session['total'] * 100) if session['total'] > 0 else 0
-                
-                is_daily_quiz = session.get('is_daily_quiz', False)
-                if is_daily_quiz:
-                    mark_daily_quiz_completed(user_id, session['score'], session['total'])
-                    newly_unlocked = check_and_award_achievements(user_id)
-                    message = f"✅ *Daily Challenge Completed!*\n\n"
-                    message += f"Final Score: {session['score']}/{session['total']} ({accuracy:.1f}%)\n\n"
-                    if newly_unlocked:
-                        message += "🎉 *New Achievement Unlocked!*\n\n"
-                        for achievement_id in newly_unlocked:
-                            achievement = ACHIEVEMENTS[achievement_id]
-                            message += f"{achievement['emoji']} {achievement['name']}\n"
-                        message += "\n"
-                    message += "Come back tomorrow for a new challenge!"
-                else:
-                    message = f"✅ *Quiz Ended*\n\n"
-                    message += f"Final Score: {session['score']}/{session['total']} ({accuracy:.1f}%)\n\n"
-                    message += "Tap '🎯 Start Quiz' to start a new quiz!"
-                
-                keyboard = [
-                    [InlineKeyboardButton("🎯 Start Quiz", callback_data="menu_quiz")],
-                    [InlineKeyboardButton("📊 My Score", callback_data="menu_score")],
-                    [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-                ]
-                
-                await self.safe_edit_message(query, 
-                    message,
-                    parse_mode='Markdown',
-                    reply_markup=InlineKeyboardMarkup(keyboard)
-                )
-            else:
-                await self.safe_edit_message(query, 
-                    "✅ Quiz session ended.\n\n"
-                    "Tap '🎯 Start Quiz' to start a new quiz!",
-                    parse_mode='Markdown',
-                    reply_markup=self.get_quick_actions_keyboard()
-                )
-        
-        elif callback_data.startswith("quiz_answer_"):
-            # Handle quiz answer - this is a large handler, keeping it here for now
-            # Could be further refactored into _handle_quiz_answer method
-            await self._handle_quiz_answer(query, callback_data, user_id)
-        
         else:
-            # Unknown quiz callback
             await self.safe_edit_message(query, 
-                "❌ Unknown quiz action. Please try again.",
-                reply_markup=self.get_main_menu_keyboard()
+                "✅ Quiz session ended.\n\n"
+                "Tap '🎯 Start Quiz' to start a new quiz!",
+                parse_mode='Markdown',
+                reply_markup=self.get_quick_actions_keyboard()
             )
     
     async def _handle_quiz_answer(self, query, callback_data: str, user_id: int):
         """Handle quiz answer callbacks - separated for better organization"""
         try:
-            active_quiz = get_quiz_session(user_id)
+            active_quiz = await asyncio.to_thread(get_quiz_session, user_id)
         except Exception as e:
             logger.error(f"Error getting quiz session from file for user {user_id}: {e}")
             active_quiz = None
         
-        if not active_quiz and str(user_id) in self._in_memory_quizzes:
-            active_quiz = self._in_memory_quizzes[str(user_id)]
-            logger.info(f"Using in-memory quiz session for user {user_id}")
+        if not active_quiz and user_id in self._in_memory_quizzes:
+            active_quiz = self._in_memory_quizzes[user_id].to_dict()
+            logger.info("Using in-memory quiz session for user %s", user_id)
         
         if not active_quiz:
             await self.safe_edit_message(query, 
@@ -2750,14 +2808,12 @@ Type the name of a Bible book to find which days include it.
         new_score = active_quiz['score'] + (1 if is_correct else 0)
         new_total = active_quiz['total'] + 1
         
-        try:
-            update_quiz_session(user_id, new_score, new_total)
-        except Exception as e:
-            logger.error(f"Error updating quiz session in file for user {user_id}: {e}")
-        
-        if str(user_id) in self._in_memory_quizzes:
-            self._in_memory_quizzes[str(user_id)]['score'] = new_score
-            self._in_memory_quizzes[str(user_id)]['total'] = new_total
+        # The stored session isn't updated here: below it is either ended (daily quiz)
+        # or replaced by the next question's session, so one write covers the answer
+        in_memory_session = self._in_memory_quizzes.get(user_id)
+        if in_memory_session is not None:
+            in_memory_session.score = new_score
+            in_memory_session.total = new_total
         
         correct_option = question_data['options'][question_data['correct']]
         chosen_option = question_data['options'][chosen_option_index]
@@ -2783,8 +2839,9 @@ Type the name of a Bible book to find which days include it.
         feedback += f"<b>Your Score:</b> {new_score}/{new_total}\n\n"
         
         user = query.from_user
-        update_user_score(user_id, new_score, new_total, username=user.username, first_name=user.first_name)
-        logger.info(f"User {user_id} answered quiz question via button: {'correct' if is_correct else 'incorrect'}")
+        if await asyncio.to_thread(update_user_score, user_id, new_score, new_total, **self._user_name_kwargs(user)):
+            self._mark_names_stored(user)
+        logger.info("User %s answered quiz question via button: %s", user_id, 'correct' if is_correct else 'incorrect')
         
         # Send feedback as a NEW message (not editing) so previous question remains visible
         try:
@@ -2800,45 +2857,35 @@ Type the name of a Bible book to find which days include it.
         
         if is_daily_quiz:
             # Daily quiz is complete after one question
-            mark_daily_quiz_completed(user_id, new_score, new_total)
+            await asyncio.to_thread(mark_daily_quiz_completed, user_id, new_score, new_total)
             try:
-                end_quiz_session(user_id)
+                await asyncio.to_thread(end_quiz_session, user_id)
             except Exception as e:
                 logger.error(f"Error ending daily quiz session: {e}")
             
-            if str(user_id) in self._in_memory_quizzes:
-                del self._in_memory_quizzes[str(user_id)]
+            self._in_memory_quizzes.pop(user_id, None)
             
-            newly_unlocked = check_and_award_achievements(user_id)
+            newly_unlocked = await asyncio.to_thread(check_and_award_achievements, user_id)
             
             completion_msg = f"{MESSAGE_SEPARATOR}\n\n"
             completion_msg += "✅ <b>Daily Challenge Completed!</b>\n\n"
             
             if newly_unlocked:
                 completion_msg += "🎉 <b>New Achievement Unlocked!</b>\n\n"
-                for achievement_id in newly_unlocked:
-                    achievement = ACHIEVEMENTS[achievement_id]
-                    completion_msg += f"{achievement['emoji']} {achievement['name']}\n"
+                completion_msg += _achievement_lines(newly_unlocked)
                 completion_msg += "\n"
             
             completion_msg += "Come back tomorrow for a new challenge!"
             
-            keyboard = [
-                [InlineKeyboardButton("⭐ New Challenge", callback_data="menu_daily_quiz")],
-                [InlineKeyboardButton("🔙 Main Menu", callback_data="menu_main")]
-            ]
-            
             # Send completion as new message
             await query.message.reply_text(
                 completion_msg,
                 parse_mode='HTML',
-                reply_markup=InlineKeyboardMarkup(keyboard)
+                reply_markup=self._daily_done_keyboard
             )
             return
         
-        # For regular quizzes: Save current session to history, end it, then start new session
-        await asyncio.sleep(1)
-        
+        # For regular quizzes: Save current session to history, then replace it with a new one
         # Save current session to history before ending it
         session_to_save = {
             'question_data': question_data,
@@ -2849,37 +2896,29 @@ Type the name of a Bible book to find which days include it.
             'chosen_answer': chosen_option_index,
             'is_correct': is_correct
         }
-        save_quiz_to_history(user_id, session_to_save)
+        await asyncio.to_thread(save_quiz_to_history, user_id, session_to_save)
         
         # Update user score with this question AND track complete quiz session
         user = query.from_user
-        update_user_score(
+        if await asyncio.to_thread(update_user_score,
             user_id, 
             new_score,  # 1 if correct, 0 if incorrect
             new_total,  # Always 1 for single question
-            username=user.username,
-            first_name=user.first_name,
+            **self._user_name_kwargs(user),
             quiz_session_score=new_score,  # Score for this session
             quiz_session_total=new_total   # Total for this session (always 1)
-        )
-        
-        # End current session
-        try:
-            end_quiz_session(user_id)
-        except Exception as e:
-            logger.error(f"Error ending quiz session: {e}")
+        ):
+            self._mark_names_stored(user)
         
-        # Remove from in-memory quizzes
-        if str(user_id) in self._in_memory_quizzes:
-            del self._in_memory_quizzes[str(user_id)]
+        # Remove from in-memory quizzes (the stored session is replaced below)
+        self._in_memory_quizzes.pop(user_id, None)
         
         # Get new question with same difficulty/category
         quiz_difficulty = active_quiz.get('difficulty')
         quiz_category = active_quiz.get('category')
         
         # Get recently asked question indices for this user to avoid repeats
-        from quiz_questions import get_question_index
-        recent_indices = self._recent_questions.get(str(user_id), [])
+        recent_indices = self._recent_questions.get(user_id)
         
         # Get a new random question (keep same difficulty/category, exclude recent ones)
         new_question = get_random_question(
@@ -2889,32 +2928,17 @@ Type the name of a Bible book to find which days include it.
         )
         
         # Track this question to avoid repeats
-        question_index = get_question_index(new_question)
-        if question_index is not None:
-            if str(user_id) not in self._recent_questions:
-                self._recent_questions[str(user_id)] = []
-            self._recent_questions[str(user_id)].append(question_index)
-            if len(self._recent_questions[str(user_id)]) > MAX_RECENT_QUESTIONS:
-                self._recent_questions[str(user_id)] = self._recent_questions[str(user_id)][-MAX_RECENT_QUESTIONS:]
-        
-        # Start a NEW session with the new question
-        user_id_str = str(user_id)
-        try:
-            start_quiz_session(user_id, 0, new_question, difficulty=quiz_difficulty, category=quiz_category)
-        except Exception as e:
-            logger.error(f"Error starting new quiz session: {e}")
-        
-        # Also save in-memory as fallback
-        self._in_memory_quizzes[user_id_str] = {
-            'question_data': new_question,
-            'question_index': 0,
-            'score': 0,  # Reset score for new session
-            'total': 0,  # Reset total for new session
-            'difficulty': quiz_difficulty,
-            'category': quiz_category
-        }
+        self._remember_question(user_id, new_question)
         
-        diff_name = new_question.get('difficulty', 'random').title()
+        # Start a NEW session with the new question (overwrites the answered one)
+        if not self._begin_quiz_session(user_id, new_question, difficulty=quiz_difficulty, category=quiz_category):
+            # Don't leave the answered question active
+            try:
+                await asyncio.to_thread(end_quiz_session, user_id)
+            except Exception as e:
+                logger.error(f"Error ending quiz session: {e}")
+        
+        diff_name = _DIFFICULTY_TITLES.get(new_question.get('difficulty'), "Random")
         # Escape HTML special characters in question text
         escaped_question = html.escape(new_question['question'])
         next_question_msg = f"""🎯 <b>New {diff_name} Quiz Question</b>
@@ -2935,73 +2959,40 @@ Type the name of a Bible book to find which days include it.
             reply_markup=self.get_quiz_answer_keyboard(new_question)
         )
     
-    async def _handle_reading_callback(self, query, callback_data: str, user_id: int):
-        """Handle reading-related callbacks"""
-        if callback_data == "reading_today":
-            day_number, date_str = self.get_day_of_year()
-            reading = self.get_bible_reading(day_number)
-            encouragement = self.get_encouragement(day_number)
-            message = self.format_message(day_number, date_str, reading, encouragement)
-            mark_day_completed(user_id, day_number)
-            await self.safe_edit_message(query, 
-                message,
-                parse_mode='Markdown',
-                reply_markup=self.get_reading_menu_keyboard()
-            )
-        elif callback_data == "reading_pick":
-            await self.safe_edit_message(query, 
-                "📅 *Pick a Day*\n\n"
-                "Type a day number (1-365) or use:\n"
-                "/day [number]\n\n"
-                "*Example:* /day 45",
-                parse_mode='Markdown',
-                reply_markup=self.get_reading_menu_keyboard()
-            )
-        else:
-            # Unknown reading callback
-            await self.safe_edit_message(query, 
-                "❌ Unknown reading action. Please try again.",
-                reply_markup=self.get_reading_menu_keyboard()
-            )
-    
     async def handle_callback(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
         """Handle inline button callbacks - routes to specific handler methods"""
         query = update.callback_query
         
-        # Answer the callback immediately to prevent timeout
-        try:
-            await query.answer()
-        except Exception as e:
-            logger.error(f"Error answering callback: {e}")
+        # Answer the callback (clears the button spinner) while the update is handled,
+        # instead of waiting for that round-trip before starting
+        answer_task = asyncio.create_task(self._answer_callback(query))
         
         user_id = query.from_user.id
-        self._ensure_subscribed(user_id)
         callback_data = query.data
         
-        logger.info(f"Received callback: {callback_data} from user {user_id}")
+        # Drop repeat clicks of a button whose previous click is still being handled
+        inflight_key = (user_id, callback_data)
+        if inflight_key in self._inflight_callbacks:
+            logger.debug("Ignoring repeated callback %s from user %s", callback_data, user_id)
+            await answer_task
+            return
+        self._inflight_callbacks.add(inflight_key)
         
         try:
-            # Route to appropriate handler based on callback prefix
-            if callback_data.startswith("menu_"):
-                logger.debug(f"Routing {callback_data} to _handle_menu_callback")
-                await self._handle_menu_callback(query, callback_data, user_id)
-            elif callback_data.startswith("quiz_") or callback_data.startswith("daily_quiz_"):
-                logger.debug(f"Routing {callback_data} to _handle_quiz_callback")
-                await self._handle_quiz_callback(query, callback_data, user_id)
-            elif callback_data.startswith("reading_"):
-                logger.debug(f"Routing {callback_data} to _handle_reading_callback")
-                await self._handle_reading_callback(query, callback_data, user_id)
+            if callback_data not in _STATIC_CALLBACKS:
+                await self._ensure_subscribed(user_id)
+            
+            logger.info("Received callback: %s from user %s", callback_data, user_id)
+            
+            handler = self._callback_table.get(callback_data)
+            if handler is not None:
+                await handler(query, user_id)
+            elif callback_data.startswith("quiz_answer_"):
+                await self._handle_quiz_answer(query, callback_data, user_id)
             else:
                 # Unknown callback - return to main menu
                 logger.warning(f"Unknown callback data: {callback_data}")
-                await self.safe_edit_message(query, 
-                    "📱 *Main Menu*\n\nChoose an option:",
-                    parse_mode='Markdown',
-                    reply_markup=self.get_main_menu_keyboard()
-                )
-            
-            # All handlers have been migrated to helper methods above
-            # No legacy code needed - routing is complete
+                await self._cb_menu_main(query, user_id)
             
         except Exception as e:
             logger.error(f"Error handling callback {callback_data}: {e}", exc_info=True)
@@ -3021,7 +3012,56 @@ Type the name of a Bible book to find which days include it.
                     )
                 except:
                     pass
+        finally:
+            self._inflight_callbacks.discard(inflight_key)
+            await answer_task
+    
+    async def _answer_callback(self, query):
+        """Answer a callback query, logging (not raising) failures"""
+        try:
+            await query.answer()
+        except Exception as e:
+            logger.error(f"Error answering callback: {e}")
+    
+    async def _post_init(self, application: Application):
+        """Warm the subscribed cache, buffer quiz session writes and start the flush task (polling mode only)"""
+        # Read at startup so existing subscribers never hit storage in _ensure_subscribed
+        await self._refresh_subscribed_cache()
+        enable_write_behind()
+        self._persist_task = asyncio.create_task(self._flush_loop())
+    
+    async def _post_shutdown(self, application: Application):
+        """Stop the flush task and write any remaining quiz session changes"""
+        if self._persist_task:
+            self._persist_task.cancel()
+            self._persist_task = None
+        flush_active_quizzes()
     
+    async def _refresh_subscribed_cache(self):
+        """Reload the subscribed cache from storage if the subscriptions file changed since the last load"""
+        # Take the mtime before reading, so a write during the read triggers another reload
+        mtime = await asyncio.to_thread(get_subscribed_users_mtime)
+        if mtime == self._subscribed_mtime:
+            return
+        users = await asyncio.to_thread(get_all_subscribed_users)
+        self._subscribed_cache = set(users)
+        self._subscribed_mtime = mtime
+    
+    async def _flush_loop(self):
+        """
+        Periodically write buffered quiz session changes to file off the event loop,
+        and pick up subscription changes made by other processes (the daily sender)
+        """
+        while True:
+            await asyncio.sleep(QUIZ_SESSION_FLUSH_INTERVAL)
+            try:
+                await asyncio.to_thread(flush_active_quizzes)
+            except Exception as e:
+                logger.error(f"Error flushing quiz sessions: {e}")
+            try:
+                await self._refresh_subscribed_cache()
+            except Exception as e:
+                logger.error(f"Error refreshing subscribed users: {e}")
     
     def run(self):
         """Start the bot"""
@@ -3045,4 +3085,6 @@ async def main():
     bot.run()
 
 if __name__ == "__main__":
+    _init_env()
+    install_uvloop()
     asyncio.run(main())
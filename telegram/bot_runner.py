@@ -7,7 +7,7 @@ This should run continuously to handle user queries
 import os
 import logging
 from dotenv import load_dotenv
-from bot import BibleVerseBot
+from bot import BibleVerseBot, install_uvloop
 
 load_dotenv()
 
@@ -32,6 +32,7 @@ def main():
     if existing_users:
         logger.info(f"Existing subscribers: {existing_users[:10]}{'...' if len(existing_users) > 10 else ''}")
     
+    install_uvloop()
     bot = BibleVerseBot(bot_token)
     logger.info("Starting interactive bot (handles user queries)...")
     bot.run()
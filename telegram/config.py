@@ -6,6 +6,8 @@ Configuration constants for the Bible in a Year Telegram Bot
 # Quiz Configuration
 MAX_RECENT_QUESTIONS = 50  # Maximum number of recent questions to track per user
 MAX_QUIZ_QUESTIONS = 10  # Maximum questions per quiz session
+MAX_IN_MEMORY_QUIZZES = 10000  # Maximum fallback quiz sessions kept in memory (least recently started evicted)
+MAX_STORED_USER_NAMES = 10000  # Maximum users whose last stored name is remembered (least recently seen evicted)
 TOTAL_QUIZ_QUESTIONS = 567  # Total questions in database
 
 # Reading Plan Configuration
@@ -16,12 +18,14 @@ PROGRESS_BAR_LENGTH = 20  # Length of progress bar in characters
 # Daily Message Configuration
 DAILY_MESSAGE_HOUR = 4  # Hour (24-hour format) for daily messages
 DAILY_MESSAGE_TIMEZONE = "GMT"  # Timezone for daily messages
+DAILY_BROADCAST_CONCURRENCY = 25  # Maximum concurrent sends during the daily broadcast
+DAILY_BROADCAST_SLOT_DELAY = 1.0  # Seconds each send slot is held after sending (rate limiting)
 
 # Leaderboard Configuration
 LEADERBOARD_TOP_N = 10  # Number of top users to show in leaderboard
 
-# UI Configuration
-ENCOURAGEMENT_MESSAGES = [
+# UI Configuration (tuple - immutable, indexed by day number)
+ENCOURAGEMENT_MESSAGES = (
     "Remember, God's love for you is unchanging and eternal. Trust in His plan for your life today!",
     "You are never alone. God is with you every step of the way, guiding and protecting you.",
     "Each new day is a gift from God. Embrace it with gratitude and faith!",
@@ -37,11 +41,12 @@ ENCOURAGEMENT_MESSAGES = [
     "Cast all your anxiety on Him because He cares for you.",
     "The Lord will fight for you; you need only to be still.",
     "Seek first His kingdom and His righteousness, and all these things will be given to you.",
-]
+)
 
 # Quiz Session Configuration
 QUIZ_SESSION_TIMEOUT_HOURS = 1  # Hours before inactive quiz session expires
 IN_MEMORY_QUIZZES_CLEANUP_INTERVAL = 3600  # Seconds between cleanup runs
+QUIZ_SESSION_FLUSH_INTERVAL = 0.25  # Seconds between batched writes of active quiz sessions
 
 # Message Formatting
 MESSAGE_SEPARATOR = "━━━━━━━━━━━━━━━━━━━━"
@@ -6,14 +6,20 @@ One special quiz per day that all users can take
 import json
 import os
 import logging
+import threading
 from datetime import datetime, date, timedelta
 
+from storage_utils import write_json_atomic
+
 logger = logging.getLogger(__name__)
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 DAILY_QUIZ_FILE = os.path.join(SCRIPT_DIR, "daily_quiz.json")
 
+# Serializes load/modify/save cycles (the bot calls these from worker threads)
+_daily_quiz_lock = threading.RLock()
+
 def _fix_storage_file(file_path):
     """Fix storage file if it's a directory (Docker volume mount issue)"""
     if os.path.exists(file_path) and os.path.isdir(file_path):
@@ -33,54 +39,56 @@ except Exception as e:
 
 def load_daily_quiz_data():
     """Load daily quiz data"""
-    if not _fix_storage_file(DAILY_QUIZ_FILE):
-        return {}
-    
-    if not os.path.exists(DAILY_QUIZ_FILE):
-        return {}
-    
-    try:
-        with open(DAILY_QUIZ_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading daily quiz data: {e}")
-        return {}
+    with _daily_quiz_lock:
+        if not _fix_storage_file(DAILY_QUIZ_FILE):
+            return {}
+        
+        if not os.path.exists(DAILY_QUIZ_FILE):
+            return {}
+        
+        try:
+            with open(DAILY_QUIZ_FILE, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading daily quiz data: {e}")
+            return {}
 
 def save_daily_quiz_data(data):
     """Save daily quiz data"""
-    if not _fix_storage_file(DAILY_QUIZ_FILE):
-        return False
-    
-    try:
-        with open(DAILY_QUIZ_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving daily quiz data: {e}")
-        return False
+    with _daily_quiz_lock:
+        if not _fix_storage_file(DAILY_QUIZ_FILE):
+            return False
+        
+        try:
+            write_json_atomic(DAILY_QUIZ_FILE, data, indent=2)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving daily quiz data: {e}")
+            return False
 
 def get_today_quiz_question():
     """Get today's daily quiz question (same for all users)"""
     from quiz_questions import get_random_question
     
-    today = date.today().isoformat()
-    data = load_daily_quiz_data()
-    
-    # Check if we already have a question for today
-    if 'daily_quizzes' in data and today in data['daily_quizzes']:
-        return data['daily_quizzes'][today]
-    
-    # Generate a new question for today
-    question = get_random_question()
-    question['date'] = today
-    
-    if 'daily_quizzes' not in data:
-        data['daily_quizzes'] = {}
-    
-    data['daily_quizzes'][today] = question
-    save_daily_quiz_data(data)
-    
-    return question
+    with _daily_quiz_lock:
+        today = date.today().isoformat()
+        data = load_daily_quiz_data()
+        
+        # Check if we already have a question for today
+        if 'daily_quizzes' in data and today in data['daily_quizzes']:
+            return data['daily_quizzes'][today]
+        
+        # Generate a new question for today
+        question = get_random_question()
+        question['date'] = today
+        
+        if 'daily_quizzes' not in data:
+            data['daily_quizzes'] = {}
+        
+        data['daily_quizzes'][today] = question
+        save_daily_quiz_data(data)
+        
+        return question
 
 def get_quiz_question_for_date(target_date):
     """Get daily quiz question for a specific date"""
@@ -94,27 +102,28 @@ def get_quiz_question_for_date(target_date):
 
 def mark_daily_quiz_completed(user_id, score, total):
     """Mark daily quiz as completed for a user"""
-    today = date.today().isoformat()
-    data = load_daily_quiz_data()
-    
-    if 'completions' not in data:
-        data['completions'] = {}
-    
-    user_id_str = str(user_id)
-    if user_id_str not in data['completions']:
-        data['completions'][user_id_str] = {}
-    
-    if today not in data['completions'][user_id_str]:
-        data['completions'][user_id_str][today] = {
-            'score': score,
-            'total': total,
-            'accuracy': (score / total * 100) if total > 0 else 0,
-            'completed_at': datetime.now().isoformat()
-        }
-        save_daily_quiz_data(data)
-        return True
-    
-    return False  # Already completed today
+    with _daily_quiz_lock:
+        today = date.today().isoformat()
+        data = load_daily_quiz_data()
+        
+        if 'completions' not in data:
+            data['completions'] = {}
+        
+        user_id_str = str(user_id)
+        if user_id_str not in data['completions']:
+            data['completions'][user_id_str] = {}
+        
+        if today not in data['completions'][user_id_str]:
+            data['completions'][user_id_str][today] = {
+                'score': score,
+                'total': total,
+                'accuracy': (score / total * 100) if total > 0 else 0,
+                'completed_at': datetime.now().isoformat()
+            }
+            save_daily_quiz_data(data)
+            return True
+        
+        return False  # Already completed today
 
 def has_completed_daily_quiz(user_id):
     """Check if user has completed today's daily quiz"""
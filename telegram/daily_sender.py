@@ -8,7 +8,7 @@ import os
 import asyncio
 import logging
 from dotenv import load_dotenv
-from bot import BibleVerseBot
+from bot import BibleVerseBot, install_uvloop
 
 load_dotenv()
 
@@ -35,5 +35,6 @@ async def send_daily_messages():
         await bot.shutdown()
 
 if __name__ == "__main__":
+    install_uvloop()
     asyncio.run(send_daily_messages())
 
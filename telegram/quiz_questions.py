@@ -3973,4 +3973,23 @@ def get_question_index(question):
     try:
         return QUIZ_QUESTIONS.index(question)
     except ValueError:
-        return None
\ No newline at end of file
+        return None
+
+def get_total_questions():
+    """Get the total number of questions in the quiz database"""
+    return len(QUIZ_QUESTIONS)
+
+def get_stats():
+    """Get question counts for the quiz database
+    
+    Returns:
+        {'total': int, 'by_difficulty': {difficulty: count}, 'by_category': {category: count}}
+    """
+    by_difficulty = {diff: 0 for diff in DIFFICULTIES}
+    by_category = {cat: 0 for cat in CATEGORIES}
+    for q in QUIZ_QUESTIONS:
+        if q.get('difficulty') in by_difficulty:
+            by_difficulty[q['difficulty']] += 1
+        if q.get('category') in by_category:
+            by_category[q['category']] += 1
+    return {'total': len(QUIZ_QUESTIONS), 'by_difficulty': by_difficulty, 'by_category': by_category}
@@ -6,6 +6,9 @@ import json
 import os
 import logging
 import shutil
+import threading
+
+from storage_utils import write_json_atomic
 
 logger = logging.getLogger(__name__)
 
@@ -15,6 +18,11 @@ SCORES_FILE = os.path.join(SCRIPT_DIR, "quiz_scores.json")
 ACTIVE_QUIZZES_FILE = os.path.join(SCRIPT_DIR, "active_quizzes.json")
 QUIZ_HISTORY_FILE = os.path.join(SCRIPT_DIR, "quiz_history.json")
 
+# Serialize load/modify/save cycles on the scores and history files (the bot calls
+# these from worker threads)
+_scores_lock = threading.RLock()
+_history_lock = threading.RLock()
+
 def _fix_storage_file(file_path):
     """Fix storage file if it's a directory (Docker volume mount issue)"""
     if os.path.exists(file_path) and os.path.isdir(file_path):
@@ -26,6 +34,18 @@ def _fix_storage_file(file_path):
         return False
     return True
 
+# Write-behind buffer for active quiz sessions (enabled by the interactive bot)
+# Maps user_id_str -> session dict, or None for a session that has ended.
+# Reads overlay it on top of the file so they never see stale data before a flush.
+_pending_sessions = {}
+_write_behind = False
+# Guards only _pending_sessions and is never held during file I/O, so staging a
+# change from the event loop doesn't wait for a flush
+_pending_lock = threading.Lock()
+# Guards the active quizzes file (flushes run in a worker thread); taken before
+# _pending_lock when both are needed
+_active_quizzes_lock = threading.RLock()
+
 # Try to fix storage files on module load (non-fatal if it fails)
 try:
     _fix_storage_file(SCORES_FILE)
@@ -36,27 +56,29 @@ except Exception as e:
 
 def load_quiz_scores():
     """Load quiz scores from file"""
-    if not os.path.exists(SCORES_FILE):
-        return {}
-    
-    try:
-        with open(SCORES_FILE, 'r') as f:
-            data = json.load(f)
-            return data.get('scores', {})
-    except Exception as e:
-        logger.error(f"Error loading quiz scores: {e}")
-        return {}
+    with _scores_lock:
+        if not os.path.exists(SCORES_FILE):
+            return {}
+        
+        try:
+            with open(SCORES_FILE, 'r') as f:
+                data = json.load(f)
+                return data.get('scores', {})
+        except Exception as e:
+            logger.error(f"Error loading quiz scores: {e}")
+            return {}
 
 def save_quiz_scores(scores):
     """Save quiz scores to file"""
-    try:
-        data = {'scores': scores}
-        with open(SCORES_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving quiz scores: {e}")
-        return False
+    with _scores_lock:
+        try:
+            data = {'scores': scores}
+            # Compact output: indent forces json's pure-Python encoder instead of the C one
+            write_json_atomic(SCORES_FILE, data, separators=(',', ':'))
+            return True
+        except Exception as e:
+            logger.error(f"Error saving quiz scores: {e}")
+            return False
 
 def get_user_score(user_id):
     """Get user's quiz score"""
@@ -73,25 +95,26 @@ def get_user_score(user_id):
 
 def update_user_info(user_id, username=None, first_name=None):
     """Update user's name information for leaderboard"""
-    scores = load_quiz_scores()
-    user_id_str = str(user_id)
-    
-    if user_id_str not in scores:
-        scores[user_id_str] = {
-            'total_answered': 0,
-            'total_correct': 0,
-            'quizzes_completed': 0,
-            'best_score': 0,
-            'username': None,
-            'first_name': None
-        }
-    
-    if username:
-        scores[user_id_str]['username'] = username
-    if first_name:
-        scores[user_id_str]['first_name'] = first_name
-    
-    return save_quiz_scores(scores)
+    with _scores_lock:
+        scores = load_quiz_scores()
+        user_id_str = str(user_id)
+        
+        if user_id_str not in scores:
+            scores[user_id_str] = {
+                'total_answered': 0,
+                'total_correct': 0,
+                'quizzes_completed': 0,
+                'best_score': 0,
+                'username': None,
+                'first_name': None
+            }
+        
+        if username:
+            scores[user_id_str]['username'] = username
+        if first_name:
+            scores[user_id_str]['first_name'] = first_name
+        
+        return save_quiz_scores(scores)
 
 def update_user_score(user_id, correct, total, username=None, first_name=None, quiz_session_score=None, quiz_session_total=None):
     """Update user's quiz score
@@ -105,56 +128,57 @@ def update_user_score(user_id, correct, total, username=None, first_name=None, q
         quiz_session_score: Optional total score for a complete quiz session
         quiz_session_total: Optional total questions for a complete quiz session
     """
-    scores = load_quiz_scores()
-    user_id_str = str(user_id)
-    
-    if user_id_str not in scores:
-        scores[user_id_str] = {
-            'total_answered': 0,
-            'total_correct': 0,
-            'quizzes_completed': 0,
-            'best_score': 0,
-            'best_session_score': 0,
-            'best_session_total': 0,
-            'username': None,
-            'first_name': None
-        }
-    
-    # Update user info if provided
-    if username:
-        scores[user_id_str]['username'] = username
-    if first_name:
-        scores[user_id_str]['first_name'] = first_name
-    
-    # Update cumulative stats
-    scores[user_id_str]['total_answered'] += total
-    scores[user_id_str]['total_correct'] += correct
-    
-    # If this is a complete quiz session, track it
-    if quiz_session_score is not None and quiz_session_total is not None and quiz_session_total > 0:
-        session_accuracy = (quiz_session_score / quiz_session_total) * 100
-        scores[user_id_str]['quizzes_completed'] += 1
+    with _scores_lock:
+        scores = load_quiz_scores()
+        user_id_str = str(user_id)
         
-        # Track best session score
-        current_best = scores[user_id_str].get('best_session_score', 0)
-        current_best_total = scores[user_id_str].get('best_session_total', 0)
-        current_best_accuracy = (current_best / current_best_total * 100) if current_best_total > 0 else 0
+        if user_id_str not in scores:
+            scores[user_id_str] = {
+                'total_answered': 0,
+                'total_correct': 0,
+                'quizzes_completed': 0,
+                'best_score': 0,
+                'best_session_score': 0,
+                'best_session_total': 0,
+                'username': None,
+                'first_name': None
+            }
         
-        if session_accuracy > current_best_accuracy or (session_accuracy == current_best_accuracy and quiz_session_total > current_best_total):
-            scores[user_id_str]['best_session_score'] = quiz_session_score
-            scores[user_id_str]['best_session_total'] = quiz_session_total
-    
-    # Calculate overall accuracy percentage
-    accuracy = (scores[user_id_str]['total_correct'] / scores[user_id_str]['total_answered']) * 100 if scores[user_id_str]['total_answered'] > 0 else 0
-    
-    # Update best score if this update improved it
-    if accuracy > scores[user_id_str]['best_score']:
-        scores[user_id_str]['best_score'] = accuracy
-    
-    return save_quiz_scores(scores)
+        # Update user info if provided
+        if username:
+            scores[user_id_str]['username'] = username
+        if first_name:
+            scores[user_id_str]['first_name'] = first_name
+        
+        # Update cumulative stats
+        scores[user_id_str]['total_answered'] += total
+        scores[user_id_str]['total_correct'] += correct
+        
+        # If this is a complete quiz session, track it
+        if quiz_session_score is not None and quiz_session_total is not None and quiz_session_total > 0:
+            session_accuracy = (quiz_session_score / quiz_session_total) * 100
+            scores[user_id_str]['quizzes_completed'] += 1
+            
+            # Track best session score
+            current_best = scores[user_id_str].get('best_session_score', 0)
+            current_best_total = scores[user_id_str].get('best_session_total', 0)
+            current_best_accuracy = (current_best / current_best_total * 100) if current_best_total > 0 else 0
+            
+            if session_accuracy > current_best_accuracy or (session_accuracy == current_best_accuracy and quiz_session_total > current_best_total):
+                scores[user_id_str]['best_session_score'] = quiz_session_score
+                scores[user_id_str]['best_session_total'] = quiz_session_total
+        
+        # Calculate overall accuracy percentage
+        accuracy = (scores[user_id_str]['total_correct'] / scores[user_id_str]['total_answered']) * 100 if scores[user_id_str]['total_answered'] > 0 else 0
+        
+        # Update best score if this update improved it
+        if accuracy > scores[user_id_str]['best_score']:
+            scores[user_id_str]['best_score'] = accuracy
+        
+        return save_quiz_scores(scores)
 
-def get_leaderboard(limit=10):
-    """Get top players sorted by best score, then by total correct"""
+def _ranked_players():
+    """All players with answers, sorted by best score, then by total correct"""
     scores = load_quiz_scores()
     
     # Filter out users with no scores
@@ -174,7 +198,11 @@ def get_leaderboard(limit=10):
     # Sort by best_score (descending), then by total_correct (descending)
     valid_users.sort(key=lambda x: (x['best_score'], x['total_correct']), reverse=True)
     
-    return valid_users[:limit]
+    return valid_users
+
+def get_leaderboard(limit=10):
+    """Get top players sorted by best score, then by total correct"""
+    return _ranked_players()[:limit]
 
 def get_user_rank(user_id):
     """Get user's rank in the leaderboard"""
@@ -187,8 +215,24 @@ def get_user_rank(user_id):
     
     return None, None
 
-def load_active_quizzes():
-    """Load active quiz sessions"""
+def get_leaderboard_and_rank(user_id, limit=10):
+    """Get top players and a user's rank from a single load and sort
+    
+    Returns:
+        (top_players, rank, user_data, total_players) - rank and user_data are
+        None if the user hasn't answered any questions
+    """
+    ranked = _ranked_players()
+    user_id_str = str(user_id)
+    
+    for rank, user in enumerate(ranked, start=1):
+        if user['user_id'] == user_id_str:
+            return ranked[:limit], rank, user, len(ranked)
+    
+    return ranked[:limit], None, None, len(ranked)
+
+def _read_active_quizzes_file():
+    """Read active quiz sessions from file"""
     # Check if storage file is a directory
     if os.path.exists(ACTIVE_QUIZZES_FILE) and os.path.isdir(ACTIVE_QUIZZES_FILE):
         logger.error(f"Storage file is still a directory! Attempting to fix: {ACTIVE_QUIZZES_FILE}")
@@ -205,6 +249,21 @@ def load_active_quizzes():
         logger.error(f"Error loading active quizzes: {e}")
         return {}
 
+def load_active_quizzes():
+    """Load active quiz sessions, including changes not yet flushed to file"""
+    # The file and the buffer are read under the file lock so a flush can't write
+    # and drop buffered entries in between
+    with _active_quizzes_lock:
+        quizzes = _read_active_quizzes_file()
+        with _pending_lock:
+            pending = list(_pending_sessions.items())
+    for user_id_str, session in pending:
+        if session is None:
+            quizzes.pop(user_id_str, None)
+        else:
+            quizzes[user_id_str] = dict(session)
+    return quizzes
+
 def save_active_quizzes(quizzes):
     """Save active quiz sessions"""
     try:
@@ -214,26 +273,72 @@ def save_active_quizzes(quizzes):
             _fix_storage_file(ACTIVE_QUIZZES_FILE)
             return False
         
-        with open(ACTIVE_QUIZZES_FILE, 'w') as f:
-            json.dump(quizzes, f, indent=2)
+        with _active_quizzes_lock:
+            write_json_atomic(ACTIVE_QUIZZES_FILE, quizzes, indent=2)
         return True
     except Exception as e:
         logger.error(f"Error saving active quizzes: {e}")
         return False
 
-def start_quiz_session(user_id, question_index, question_data, difficulty=None, category=None):
+def enable_write_behind():
+    """Buffer quiz session writes in memory until flush_active_quizzes() is called"""
+    global _write_behind
+    _write_behind = True
+
+def _stage_session(user_id_str, session):
+    """Record a session change (None = ended) in the write-behind buffer"""
+    with _pending_lock:
+        _pending_sessions[user_id_str] = session
+
+def flush_active_quizzes():
+    """Write all buffered session changes to file in a single save
+    
+    Safe to call from a worker thread. Returns True if there was nothing to
+    write or the write succeeded; on failure the changes stay buffered.
+    """
+    with _active_quizzes_lock:
+        with _pending_lock:
+            if not _pending_sessions:
+                return True
+            pending = dict(_pending_sessions)
+        
+        quizzes = _read_active_quizzes_file()
+        for user_id_str, session in pending.items():
+            if session is None:
+                quizzes.pop(user_id_str, None)
+            else:
+                quizzes[user_id_str] = session
+        if not save_active_quizzes(quizzes):
+            return False
+        
+        # Drop only what was written; anything staged again during the save stays buffered
+        with _pending_lock:
+            for user_id_str, session in pending.items():
+                if user_id_str in _pending_sessions and _pending_sessions[user_id_str] is session:
+                    del _pending_sessions[user_id_str]
+        return True
+
+def start_quiz_session(user_id, question_index, question_data, difficulty=None, category=None, is_daily_quiz=False):
     """Start a new quiz session for a user"""
-    quizzes = load_active_quizzes()
-    quizzes[str(user_id)] = {
+    session = {
         'question_index': question_index,
         'question_data': question_data,
         'score': 0,
         'total': 0,
         'started_at': None,
         'difficulty': difficulty,  # Store difficulty to maintain it throughout session
-        'category': category  # Store category to maintain it throughout session
+        'category': category,  # Store category to maintain it throughout session
+        'is_daily_quiz': is_daily_quiz
     }
-    return save_active_quizzes(quizzes)
+    user_id_str = str(user_id)
+    if _write_behind:
+        _stage_session(user_id_str, session)
+        return True
+    
+    with _active_quizzes_lock:
+        quizzes = load_active_quizzes()
+        quizzes[user_id_str] = session
+        return save_active_quizzes(quizzes)
 
 def get_quiz_session(user_id):
     """Get active quiz session for a user"""
@@ -242,87 +347,96 @@ def get_quiz_session(user_id):
 
 def update_quiz_session(user_id, score, total):
     """Update quiz session with new score"""
-    quizzes = load_active_quizzes()
-    user_id_str = str(user_id)
-    
-    if user_id_str in quizzes:
-        quizzes[user_id_str]['score'] = score
-        quizzes[user_id_str]['total'] = total
-        return save_active_quizzes(quizzes)
-    return False
+    with _active_quizzes_lock:
+        quizzes = load_active_quizzes()
+        user_id_str = str(user_id)
+        
+        if user_id_str in quizzes:
+            quizzes[user_id_str]['score'] = score
+            quizzes[user_id_str]['total'] = total
+            if _write_behind:
+                _stage_session(user_id_str, quizzes[user_id_str])
+                return True
+            return save_active_quizzes(quizzes)
+        return False
 
 def end_quiz_session(user_id):
     """End and remove quiz session for a user"""
-    quizzes = load_active_quizzes()
-    user_id_str = str(user_id)
-    
-    if user_id_str in quizzes:
-        session = quizzes[user_id_str]
-        del quizzes[user_id_str]
-        save_active_quizzes(quizzes)
-        return session
-    return None
+    with _active_quizzes_lock:
+        quizzes = load_active_quizzes()
+        user_id_str = str(user_id)
+        
+        if user_id_str in quizzes:
+            session = quizzes[user_id_str]
+            if _write_behind:
+                _stage_session(user_id_str, None)
+                return session
+            del quizzes[user_id_str]
+            save_active_quizzes(quizzes)
+            return session
+        return None
 
 def save_quiz_to_history(user_id, session_data):
     """Save a completed quiz session to history"""
     import datetime
     
-    # Check if storage file is a directory
-    if os.path.exists(QUIZ_HISTORY_FILE) and os.path.isdir(QUIZ_HISTORY_FILE):
-        logger.error(f"Storage file is a directory! Cannot save history: {QUIZ_HISTORY_FILE}")
-        return False
-    
-    try:
-        # Load existing history
-        if os.path.exists(QUIZ_HISTORY_FILE):
-            with open(QUIZ_HISTORY_FILE, 'r') as f:
-                history = json.load(f)
-        else:
-            history = {}
-        
-        user_id_str = str(user_id)
-        
-        # Initialize user history if needed
-        if user_id_str not in history:
-            history[user_id_str] = []
-        
-        # Add timestamp and save session
-        session_with_timestamp = {
-            **session_data,
-            'completed_at': datetime.datetime.now().isoformat(),
-            'session_id': f"{user_id_str}_{datetime.datetime.now().timestamp()}"
-        }
-        
-        history[user_id_str].append(session_with_timestamp)
-        
-        # Keep only last 100 sessions per user to prevent file from growing too large
-        if len(history[user_id_str]) > 100:
-            history[user_id_str] = history[user_id_str][-100:]
-        
-        # Save history
-        with open(QUIZ_HISTORY_FILE, 'w') as f:
-            json.dump(history, f, indent=2)
+    with _history_lock:
+        # Check if storage file is a directory
+        if os.path.exists(QUIZ_HISTORY_FILE) and os.path.isdir(QUIZ_HISTORY_FILE):
+            logger.error(f"Storage file is a directory! Cannot save history: {QUIZ_HISTORY_FILE}")
+            return False
         
-        return True
-    except Exception as e:
-        logger.error(f"Error saving quiz to history: {e}")
-        return False
+        try:
+            # Load existing history
+            if os.path.exists(QUIZ_HISTORY_FILE):
+                with open(QUIZ_HISTORY_FILE, 'r') as f:
+                    history = json.load(f)
+            else:
+                history = {}
+            
+            user_id_str = str(user_id)
+            
+            # Initialize user history if needed
+            if user_id_str not in history:
+                history[user_id_str] = []
+            
+            # Add timestamp and save session
+            session_with_timestamp = {
+                **session_data,
+                'completed_at': datetime.datetime.now().isoformat(),
+                'session_id': f"{user_id_str}_{datetime.datetime.now().timestamp()}"
+            }
+            
+            history[user_id_str].append(session_with_timestamp)
+            
+            # Keep only last 100 sessions per user to prevent file from growing too large
+            if len(history[user_id_str]) > 100:
+                history[user_id_str] = history[user_id_str][-100:]
+            
+            # Save history
+            write_json_atomic(QUIZ_HISTORY_FILE, history, separators=(',', ':'))
+            
+            return True
+        except Exception as e:
+            logger.error(f"Error saving quiz to history: {e}")
+            return False
 
 def get_quiz_history(user_id, limit=10):
     """Get quiz history for a user"""
-    if not os.path.exists(QUIZ_HISTORY_FILE):
-        return []
-    
-    try:
-        with open(QUIZ_HISTORY_FILE, 'r') as f:
-            history = json.load(f)
-        
-        user_id_str = str(user_id)
-        user_history = history.get(user_id_str, [])
+    with _history_lock:
+        if not os.path.exists(QUIZ_HISTORY_FILE):
+            return []
         
-        # Return most recent sessions first
-        return list(reversed(user_history[-limit:]))
-    except Exception as e:
-        logger.error(f"Error loading quiz history: {e}")
-        return []
+        try:
+            with open(QUIZ_HISTORY_FILE, 'r') as f:
+                history = json.load(f)
+            
+            user_id_str = str(user_id)
+            user_history = history.get(user_id_str, [])
+            
+            # Return most recent sessions first
+            return list(reversed(user_history[-limit:]))
+        except Exception as e:
+            logger.error(f"Error loading quiz history: {e}")
+            return []
 
@@ -3,17 +3,35 @@ Storage for reading progress tracking
 Tracks which days users have completed in their Bible reading
 """
 
+import calendar
+import functools
 import json
 import os
 import logging
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
 
+from storage_utils import write_json_atomic
+
 logger = logging.getLogger(__name__)
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 PROGRESS_FILE = os.path.join(SCRIPT_DIR, "reading_progress.json")
 
+# Serializes load/modify/save cycles (the bot calls these from worker threads)
+_progress_lock = threading.RLock()
+
+# Seconds a user's dashboard stays cached; it only changes when a day is marked
+# completed (which drops the entry) or when the date rolls over (part of the key)
+DASHBOARD_CACHE_TTL = 30
+# Maximum cached dashboards (least recently used evicted first)
+DASHBOARD_CACHE_MAX_ENTRIES = 10000
+# user_id_str -> (expires_at, day_number, year, dashboard), guarded by _progress_lock
+_dashboard_cache = OrderedDict()
+
 def _fix_storage_file(file_path):
     """Fix storage file if it's a directory (Docker volume mount issue)"""
     if os.path.exists(file_path) and os.path.isdir(file_path):
@@ -31,76 +49,90 @@ try:
 except Exception as e:
     logger.error(f"Error checking storage file: {e}")
 
+def _read_progress_file():
+    """
+    Read reading progress from file
+    Returns: (progress, ok) - ok is False if the file exists but couldn't be read
+    """
+    with _progress_lock:
+        if not _fix_storage_file(PROGRESS_FILE):
+            return {}, False
+        
+        if not os.path.exists(PROGRESS_FILE):
+            return {}, True
+        
+        try:
+            with open(PROGRESS_FILE, 'r') as f:
+                data = json.load(f)
+                return data.get('progress', {}), True
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in progress file {PROGRESS_FILE}: {e}")
+            return {}, False
+        except Exception as e:
+            logger.error(f"Error loading reading progress: {e}")
+            return {}, False
+
 def load_reading_progress():
     """Load reading progress from file"""
-    if not _fix_storage_file(PROGRESS_FILE):
-        return {}
-    
-    if not os.path.exists(PROGRESS_FILE):
-        return {}
-    
-    try:
-        with open(PROGRESS_FILE, 'r') as f:
-            data = json.load(f)
-            return data.get('progress', {})
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in progress file {PROGRESS_FILE}: {e}")
-        return {}
-    except Exception as e:
-        logger.error(f"Error loading reading progress: {e}")
-        return {}
+    return _read_progress_file()[0]
 
 def save_reading_progress(progress):
     """Save reading progress to file"""
-    if not _fix_storage_file(PROGRESS_FILE):
-        return False
-    
-    try:
-        data = {'progress': progress}
-        with open(PROGRESS_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving reading progress: {e}")
-        return False
+    with _progress_lock:
+        if not _fix_storage_file(PROGRESS_FILE):
+            return False
+        
+        try:
+            data = {'progress': progress}
+            write_json_atomic(PROGRESS_FILE, data, separators=(',', ':'))
+            return True
+        except Exception as e:
+            logger.error(f"Error saving reading progress: {e}")
+            return False
 
 def mark_day_completed(user_id, day_number, year=None):
     """Mark a day as completed for a user"""
-    if year is None:
-        year = datetime.now().year
-    
-    progress = load_reading_progress()
-    user_id_str = str(user_id)
-    year_str = str(year)
-    
-    if user_id_str not in progress:
-        progress[user_id_str] = {}
-    
-    if year_str not in progress[user_id_str]:
-        progress[user_id_str][year_str] = {
-            'completed_days': [],
-            'last_completed': None,
-            'total_completed': 0
-        }
-    
-    if day_number not in progress[user_id_str][year_str]['completed_days']:
-        progress[user_id_str][year_str]['completed_days'].append(day_number)
-        progress[user_id_str][year_str]['completed_days'].sort()
-        progress[user_id_str][year_str]['last_completed'] = day_number
-        progress[user_id_str][year_str]['total_completed'] = len(progress[user_id_str][year_str]['completed_days'])
-    
-    return save_reading_progress(progress)
+    with _progress_lock:
+        if year is None:
+            year = datetime.now().year
+        
+        progress, ok = _read_progress_file()
+        if not ok:
+            # Saving now would overwrite every other user's progress with this one entry
+            logger.error(f"Not marking day {day_number} for user {user_id}: progress file could not be read")
+            return False
+        user_id_str = str(user_id)
+        year_str = str(year)
+        
+        if user_id_str not in progress:
+            progress[user_id_str] = {}
+        
+        if year_str not in progress[user_id_str]:
+            progress[user_id_str][year_str] = {
+                'completed_days': [],
+                'last_completed': None,
+                'total_completed': 0
+            }
+        
+        if day_number not in progress[user_id_str][year_str]['completed_days']:
+            progress[user_id_str][year_str]['completed_days'].append(day_number)
+            progress[user_id_str][year_str]['completed_days'].sort()
+            progress[user_id_str][year_str]['last_completed'] = day_number
+            progress[user_id_str][year_str]['total_completed'] = len(progress[user_id_str][year_str]['completed_days'])
+        
+        saved = save_reading_progress(progress)
+        _dashboard_cache.pop(user_id_str, None)
+        return saved
 
-def get_user_progress(user_id, year=None):
-    """Get reading progress for a user"""
-    if year is None:
-        year = datetime.now().year
-    
-    progress = load_reading_progress()
-    user_id_str = str(user_id)
-    year_str = str(year)
-    
-    if user_id_str not in progress or year_str not in progress[user_id_str]:
+@functools.lru_cache(maxsize=8)
+def _days_in_year(year):
+    """Number of days in a year (366 for leap years)"""
+    return 366 if calendar.isleap(year) else 365
+
+def _progress_summary(user_years, year):
+    """Build the progress summary for one year from a user's stored years"""
+    user_data = user_years.get(str(year))
+    if user_data is None:
         return {
             'completed_days': [],
             'last_completed': None,
@@ -108,12 +140,7 @@ def get_user_progress(user_id, year=None):
             'completion_percentage': 0.0
         }
     
-    user_data = progress[user_id_str][year_str]
-    total_days = 365  # Standard year
-    if year % 4 == 0 and (year % 100 != 0 or year % 400 == 0):
-        total_days = 366  # Leap year
-    
-    completion_percentage = (user_data['total_completed'] / total_days) * 100
+    completion_percentage = (user_data['total_completed'] / _days_in_year(year)) * 100
     
     return {
         'completed_days': user_data.get('completed_days', []),
@@ -122,98 +149,24 @@ def get_user_progress(user_id, year=None):
         'completion_percentage': completion_percentage
     }
 
-def get_current_streak(user_id, year=None):
-    """Calculate current reading streak (consecutive days)"""
-    if year is None:
-        year = datetime.now().year
-    
-    progress = get_user_progress(user_id, year)
-    completed_days = set(progress['completed_days'])
-    
+def _current_streak(completed_days):
+    """Count consecutive completed days ending today (or yesterday if today isn't done yet)"""
     if not completed_days:
         return 0
     
     # Get current day of year
-    today = datetime.now()
-    current_day = today.timetuple().tm_yday
-    
-    # Check if today is completed
-    if current_day in completed_days:
-        # Count backwards from today
-        streak = 0
-        check_day = current_day
-        while check_day in completed_days and check_day > 0:
-            streak += 1
-            check_day -= 1
-        return streak
-    else:
-        # Count backwards from yesterday
-        streak = 0
-        check_day = current_day - 1
-        while check_day in completed_days and check_day > 0:
-            streak += 1
-            check_day -= 1
-        return streak
-
-def get_longest_streak(user_id, year=None):
-    """Calculate longest reading streak for the year (or all-time if year is None)"""
-    if year is None:
-        # Get all-time longest streak across all years
-        progress = load_reading_progress()
-        user_id_str = str(user_id)
-        
-        if user_id_str not in progress:
-            return 0
-        
-        all_days = []
-        for year_str, year_data in progress[user_id_str].items():
-            try:
-                year_num = int(year_str)
-                completed_days = year_data.get('completed_days', [])
-                # Convert to absolute day numbers (accounting for year)
-                for day in completed_days:
-                    # Calculate absolute day number from year start
-                    all_days.append((year_num, day))
-            except (ValueError, KeyError):
-                continue
-        
-        if not all_days:
-            return 0
-        
-        # Sort by year and day
-        all_days.sort()
-        
-        # Calculate longest streak across years
-        longest_streak = 1
-        current_streak = 1
-        
-        for i in range(1, len(all_days)):
-            prev_year, prev_day = all_days[i-1]
-            curr_year, curr_day = all_days[i]
-            
-            # Check if consecutive (same year and next day, or year transition)
-            if curr_year == prev_year and curr_day == prev_day + 1:
-                current_streak += 1
-                longest_streak = max(longest_streak, current_streak)
-            elif curr_year == prev_year + 1:
-                # Check if it's the last day of previous year and first day of current year
-                from datetime import date
-                prev_date = date(prev_year, 1, 1)
-                prev_absolute = (prev_date.replace(month=12, day=31) - prev_date).days + 1
-                if prev_day == prev_absolute and curr_day == 1:
-                    current_streak += 1
-                    longest_streak = max(longest_streak, current_streak)
-                else:
-                    current_streak = 1
-            else:
-                current_streak = 1
-        
-        return longest_streak
-    
-    # Single year calculation (original logic)
-    progress = get_user_progress(user_id, year)
-    completed_days = sorted(progress['completed_days'])
+    current_day = datetime.now().timetuple().tm_yday
     
+    # Count backwards from today if it's completed, otherwise from yesterday
+    check_day = current_day if current_day in completed_days else current_day - 1
+    streak = 0
+    while check_day in completed_days and check_day > 0:
+        streak += 1
+        check_day -= 1
+    return streak
+
+def _longest_streak_in_year(completed_days):
+    """Longest run of consecutive days in a sorted list of day numbers"""
     if not completed_days:
         return 0
     
@@ -229,6 +182,117 @@ def get_longest_streak(user_id, year=None):
     
     return longest_streak
 
+def _longest_streak_all_time(user_years):
+    """Longest run of consecutive days across all of a user's stored years"""
+    all_days = []
+    for year_str, year_data in user_years.items():
+        try:
+            year_num = int(year_str)
+            completed_days = year_data.get('completed_days', [])
+            # Convert to absolute day numbers (accounting for year)
+            for day in completed_days:
+                # Calculate absolute day number from year start
+                all_days.append((year_num, day))
+        except (ValueError, KeyError):
+            continue
+    
+    if not all_days:
+        return 0
+    
+    # Sort by year and day
+    all_days.sort()
+    
+    # Calculate longest streak across years
+    longest_streak = 1
+    current_streak = 1
+    
+    for i in range(1, len(all_days)):
+        prev_year, prev_day = all_days[i-1]
+        curr_year, curr_day = all_days[i]
+        
+        # Check if consecutive (same year and next day, or year transition)
+        if curr_year == prev_year and curr_day == prev_day + 1:
+            current_streak += 1
+            longest_streak = max(longest_streak, current_streak)
+        elif curr_year == prev_year + 1:
+            # Check if it's the last day of previous year and first day of current year
+            if prev_day == _days_in_year(prev_year) and curr_day == 1:
+                current_streak += 1
+                longest_streak = max(longest_streak, current_streak)
+            else:
+                current_streak = 1
+        else:
+            current_streak = 1
+    
+    return longest_streak
+
+def get_user_progress(user_id, year=None):
+    """Get reading progress for a user"""
+    if year is None:
+        year = datetime.now().year
+    
+    progress = load_reading_progress()
+    return _progress_summary(progress.get(str(user_id), {}), year)
+
+def get_current_streak(user_id, year=None):
+    """Calculate current reading streak (consecutive days)"""
+    if year is None:
+        year = datetime.now().year
+    
+    progress = get_user_progress(user_id, year)
+    return _current_streak(set(progress['completed_days']))
+
+def get_longest_streak(user_id, year=None):
+    """Calculate longest reading streak for the year (or all-time if year is None)"""
+    if year is None:
+        # Get all-time longest streak across all years
+        progress = load_reading_progress()
+        return _longest_streak_all_time(progress.get(str(user_id), {}))
+    
+    # Single year calculation (original logic)
+    progress = get_user_progress(user_id, year)
+    return _longest_streak_in_year(sorted(progress['completed_days']))
+
+def get_user_dashboard(user_id, day_number=None, year=None):
+    """
+    Get everything the progress/streak/stats screens show from a single file load
+    Returns: dict with progress, current_streak, longest_streak (this year),
+             longest_streak_all_time and day_completed (for day_number, default today)
+    """
+    if year is None:
+        year = datetime.now().year
+    if day_number is None:
+        day_number = datetime.now().timetuple().tm_yday
+    
+    user_id_str = str(user_id)
+    with _progress_lock:
+        now = time.monotonic()
+        cached = _dashboard_cache.get(user_id_str)
+        if cached is not None and cached[0] > now and cached[1] == day_number and cached[2] == year:
+            _dashboard_cache.move_to_end(user_id_str)
+            return cached[3]
+        
+        progress_data, ok = _read_progress_file()
+        user_years = progress_data.get(user_id_str, {})
+        progress = _progress_summary(user_years, year)
+        completed_days = progress['completed_days']
+        completed_set = set(completed_days)
+        
+        dashboard = {
+            'progress': progress,
+            'current_streak': _current_streak(completed_set),
+            'longest_streak': _longest_streak_in_year(sorted(completed_days)),
+            'longest_streak_all_time': _longest_streak_all_time(user_years),
+            'day_completed': day_number in completed_set
+        }
+        # Don't keep showing an empty dashboard for the whole TTL after a failed read
+        if ok:
+            _dashboard_cache[user_id_str] = (now + DASHBOARD_CACHE_TTL, day_number, year, dashboard)
+            _dashboard_cache.move_to_end(user_id_str)
+            if len(_dashboard_cache) > DASHBOARD_CACHE_MAX_ENTRIES:
+                _dashboard_cache.popitem(last=False)
+        return dashboard
+
 def is_day_completed(user_id, day_number, year=None):
     """Check if a specific day is completed"""
     if year is None:
@@ -6,14 +6,20 @@ Customizable reminder times for users
 import json
 import os
 import logging
+import threading
 from datetime import datetime, time
 
+from storage_utils import write_json_atomic
+
 logger = logging.getLogger(__name__)
 
 # Get the directory where this script is located
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 REMINDERS_FILE = os.path.join(SCRIPT_DIR, "reminders.json")
 
+# Serializes load/modify/save cycles (the bot calls these from worker threads)
+_reminders_lock = threading.RLock()
+
 def _fix_storage_file(file_path):
     """Fix storage file if it's a directory (Docker volume mount issue)"""
     if os.path.exists(file_path) and os.path.isdir(file_path):
@@ -33,101 +39,106 @@ except Exception as e:
 
 def load_reminders():
     """Load user reminders"""
-    if not _fix_storage_file(REMINDERS_FILE):
-        return {}
-    
-    if not os.path.exists(REMINDERS_FILE):
-        return {}
-    
-    try:
-        with open(REMINDERS_FILE, 'r') as f:
-            return json.load(f)
-    except Exception as e:
-        logger.error(f"Error loading reminders: {e}")
-        return {}
+    with _reminders_lock:
+        if not _fix_storage_file(REMINDERS_FILE):
+            return {}
+        
+        if not os.path.exists(REMINDERS_FILE):
+            return {}
+        
+        try:
+            with open(REMINDERS_FILE, 'r') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.error(f"Error loading reminders: {e}")
+            return {}
 
 def save_reminders(reminders):
     """Save user reminders"""
-    if not _fix_storage_file(REMINDERS_FILE):
-        return False
-    
-    try:
-        with open(REMINDERS_FILE, 'w') as f:
-            json.dump(reminders, f, indent=2)
-        return True
-    except Exception as e:
-        logger.error(f"Error saving reminders: {e}")
-        return False
+    with _reminders_lock:
+        if not _fix_storage_file(REMINDERS_FILE):
+            return False
+        
+        try:
+            write_json_atomic(REMINDERS_FILE, reminders, indent=2)
+            return True
+        except Exception as e:
+            logger.error(f"Error saving reminders: {e}")
+            return False
 
 def set_reminder(user_id, hour, minute):
     """Set reminder time for user"""
-    reminders = load_reminders()
-    user_id_str = str(user_id)
-    
-    if user_id_str not in reminders:
-        reminders[user_id_str] = {
-            'enabled': True,
-            'times': []
-        }
-    
-    reminder_time = f"{hour:02d}:{minute:02d}"
-    
-    if reminder_time not in reminders[user_id_str]['times']:
-        reminders[user_id_str]['times'].append(reminder_time)
-        reminders[user_id_str]['times'].sort()
-    
-    reminders[user_id_str]['enabled'] = True
-    save_reminders(reminders)
-    return True
+    with _reminders_lock:
+        reminders = load_reminders()
+        user_id_str = str(user_id)
+        
+        if user_id_str not in reminders:
+            reminders[user_id_str] = {
+                'enabled': True,
+                'times': []
+            }
+        
+        reminder_time = f"{hour:02d}:{minute:02d}"
+        
+        if reminder_time not in reminders[user_id_str]['times']:
+            reminders[user_id_str]['times'].append(reminder_time)
+            reminders[user_id_str]['times'].sort()
+        
+        reminders[user_id_str]['enabled'] = True
+        save_reminders(reminders)
+        return True
 
 def remove_reminder(user_id, hour, minute):
     """Remove a specific reminder time"""
-    reminders = load_reminders()
-    user_id_str = str(user_id)
-    
-    if user_id_str not in reminders:
+    with _reminders_lock:
+        reminders = load_reminders()
+        user_id_str = str(user_id)
+        
+        if user_id_str not in reminders:
+            return False
+        
+        reminder_time = f"{hour:02d}:{minute:02d}"
+        
+        if reminder_time in reminders[user_id_str]['times']:
+            reminders[user_id_str]['times'].remove(reminder_time)
+            save_reminders(reminders)
+            return True
+        
         return False
-    
-    reminder_time = f"{hour:02d}:{minute:02d}"
-    
-    if reminder_time in reminders[user_id_str]['times']:
-        reminders[user_id_str]['times'].remove(reminder_time)
-        save_reminders(reminders)
-        return True
-    
-    return False
 
 def disable_reminders(user_id):
     """Disable all reminders for user"""
-    reminders = load_reminders()
-    user_id_str = str(user_id)
-    
-    if user_id_str not in reminders:
-        reminders[user_id_str] = {
-            'enabled': False,
-            'times': []
-        }
-    else:
-        reminders[user_id_str]['enabled'] = False
-    
-    save_reminders(reminders)
-    return True
+    with _reminders_lock:
+        reminders = load_reminders()
+        user_id_str = str(user_id)
+        
+        if user_id_str not in reminders:
+            reminders[user_id_str] = {
+                'enabled': False,
+                'times': []
+            }
+        else:
+            reminders[user_id_str]['enabled'] = False
+        
+        save_reminders(reminders)
+        return True
 
 def enable_reminders(user_id):
     """Enable reminders for user"""
-    reminders = load_reminders()
-    user_id_str = str(user_id)
-    
-    if user_id_str not in reminders:
-        reminders[user_id_str] = {
-            'enabled': True,
-            'times': []
-        }
-    else:
-        reminders[user_id_str]['enabled'] = True
-    
-    save_reminders(reminders)
-    return True
+    with _reminders_lock:
+        reminders = load_reminders()
+        user_id_str = str(user_id)
+        
+        if user_id_str not in reminders:
+            reminders[user_id_str] = {
+                'enabled': True,
+                'times': []
+            }
+        else:
+            reminders[user_id_str]['enabled'] = True
+        
+        save_reminders(reminders)
+        return True
 
 def get_user_reminders(user_id):
     """Get user's reminder settings"""
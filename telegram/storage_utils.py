@@ -0,0 +1,41 @@
+"""
+Shared helpers for the JSON storage files
+"""
+
+import errno
+import json
+import os
+import logging
+import tempfile
+
+logger = logging.getLogger(__name__)
+
+def write_json_atomic(file_path, data, **dump_kwargs):
+    """Write data to file_path as JSON without readers ever seeing a partial file
+    
+    The JSON goes to a temp file in the same directory which then replaces
+    file_path. Files bind-mounted one by one (see docker-compose.yml) can't be
+    replaced, so those are rewritten in place instead; callers hold their
+    module's storage lock around saves either way.
+    """
+    payload = json.dumps(data, **dump_kwargs)
+    directory = os.path.dirname(file_path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(file_path)}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(payload)
+        if os.path.exists(file_path):
+            # mkstemp creates the file 0600; keep the existing file's permissions
+            os.chmod(tmp_path, os.stat(file_path).st_mode & 0o777)
+        try:
+            os.replace(tmp_path, file_path)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EBUSY, errno.EXDEV, errno.EPERM):
+                raise
+            logger.debug(f"Cannot replace {file_path} ({e}), writing it in place")
+        with open(file_path, 'w') as f:
+            f.write(payload)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
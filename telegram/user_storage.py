@@ -6,6 +6,9 @@ import json
 import os
 import logging
 import shutil
+import threading
+
+from storage_utils import write_json_atomic
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +16,9 @@ logger = logging.getLogger(__name__)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
 STORAGE_FILE = os.path.join(SCRIPT_DIR, "subscribed_users.json")
 
+# Serializes load/modify/save cycles (the bot calls these from worker threads)
+_users_lock = threading.RLock()
+
 def _fix_storage_file():
     """Fix storage file if it's a directory (Docker volume mount issue)"""
     if os.path.exists(STORAGE_FILE) and os.path.isdir(STORAGE_FILE):
@@ -38,106 +44,161 @@ logger.info(f"User storage file path: {STORAGE_FILE}")
 
 def load_subscribed_users():
     """Load list of subscribed user IDs from file"""
-    # Check if storage file is a directory (shouldn't happen after fix, but double-check)
-    if os.path.exists(STORAGE_FILE) and os.path.isdir(STORAGE_FILE):
-        logger.error(f"Storage file is still a directory! Attempting to fix: {STORAGE_FILE}")
-        _fix_storage_file()
-        return []  # Return empty list after fixing
-    
-    if not os.path.exists(STORAGE_FILE):
-        logger.info(f"Storage file does not exist yet: {STORAGE_FILE}")
-        return []
-    
-    try:
-        with open(STORAGE_FILE, 'r') as f:
-            data = json.load(f)
-            users = data.get('users', [])
-            logger.info(f"Loaded {len(users)} subscribed users from {STORAGE_FILE}")
-            return users
-    except json.JSONDecodeError as e:
-        logger.error(f"Invalid JSON in storage file {STORAGE_FILE}: {e}")
-        return []
-    except Exception as e:
-        logger.error(f"Error loading subscribed users from {STORAGE_FILE}: {e}")
-        return []
-
-def save_subscribed_users(user_ids):
-    """Save list of subscribed user IDs to file"""
-    try:
+    with _users_lock:
         # Check if storage file is a directory (shouldn't happen after fix, but double-check)
         if os.path.exists(STORAGE_FILE) and os.path.isdir(STORAGE_FILE):
-            logger.error(f"Storage file is a directory! Attempting to fix: {STORAGE_FILE}")
+            logger.error(f"Storage file is still a directory! Attempting to fix: {STORAGE_FILE}")
             _fix_storage_file()
+            return []  # Return empty list after fixing
         
-        # Ensure directory exists (only if STORAGE_FILE has a directory component)
-        storage_dir = os.path.dirname(STORAGE_FILE)
-        if storage_dir:  # Only create directory if path has a directory component
-            os.makedirs(storage_dir, exist_ok=True)
+        if not os.path.exists(STORAGE_FILE):
+            logger.info(f"Storage file does not exist yet: {STORAGE_FILE}")
+            return []
         
-        data = {'users': list(set(user_ids))}  # Remove duplicates
-        with open(STORAGE_FILE, 'w') as f:
-            json.dump(data, f, indent=2)
-        logger.info(f"Successfully saved {len(data['users'])} subscribed users to {STORAGE_FILE}")
-        
-        # Verify the file was written correctly
-        if os.path.exists(STORAGE_FILE) and os.path.isfile(STORAGE_FILE):
-            file_size = os.path.getsize(STORAGE_FILE)
-            logger.info(f"Storage file verified: {STORAGE_FILE} ({file_size} bytes)")
-        else:
-            logger.warning(f"Storage file was not created or is not a file: {STORAGE_FILE}")
+        try:
+            with open(STORAGE_FILE, 'r') as f:
+                data = json.load(f)
+                users = data.get('users', [])
+                logger.info(f"Loaded {len(users)} subscribed users from {STORAGE_FILE}")
+                return users
+        except json.JSONDecodeError as e:
+            logger.error(f"Invalid JSON in storage file {STORAGE_FILE}: {e}")
+            return []
+        except Exception as e:
+            logger.error(f"Error loading subscribed users from {STORAGE_FILE}: {e}")
+            return []
+
+def save_subscribed_users(user_ids):
+    """Save list of subscribed user IDs to file"""
+    with _users_lock:
+        try:
+            # Check if storage file is a directory (shouldn't happen after fix, but double-check)
+            if os.path.exists(STORAGE_FILE) and os.path.isdir(STORAGE_FILE):
+                logger.error(f"Storage file is a directory! Attempting to fix: {STORAGE_FILE}")
+                _fix_storage_file()
+            
+            # Ensure directory exists (only if STORAGE_FILE has a directory component)
+            storage_dir = os.path.dirname(STORAGE_FILE)
+            if storage_dir:  # Only create directory if path has a directory component
+                os.makedirs(storage_dir, exist_ok=True)
+            
+            data = {'users': list(set(user_ids))}  # Remove duplicates
+            write_json_atomic(STORAGE_FILE, data, indent=2)
+            logger.info(f"Successfully saved {len(data['users'])} subscribed users to {STORAGE_FILE}")
+            
+            # Verify the file was written correctly
+            if os.path.exists(STORAGE_FILE) and os.path.isfile(STORAGE_FILE):
+                file_size = os.path.getsize(STORAGE_FILE)
+                logger.info(f"Storage file verified: {STORAGE_FILE} ({file_size} bytes)")
+            else:
+                logger.warning(f"Storage file was not created or is not a file: {STORAGE_FILE}")
+                return False
+            
+            return True
+        except PermissionError as e:
+            logger.error(f"Permission denied saving subscribed users to {STORAGE_FILE}: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Error saving subscribed users to {STORAGE_FILE}: {e}")
             return False
-        
-        return True
-    except PermissionError as e:
-        logger.error(f"Permission denied saving subscribed users to {STORAGE_FILE}: {e}")
-        return False
-    except Exception as e:
-        logger.error(f"Error saving subscribed users to {STORAGE_FILE}: {e}")
-        return False
 
 def add_user(user_id):
     """Add a user to the subscription list"""
     try:
-        users = load_subscribed_users()
-        if user_id not in users:
-            users.append(user_id)
-            if save_subscribed_users(users):
-                logger.info(f"Successfully added user {user_id} to subscriptions")
-                return True
+        with _users_lock:
+            users = load_subscribed_users()
+            if user_id not in users:
+                users.append(user_id)
+                if save_subscribed_users(users):
+                    logger.info(f"Successfully added user {user_id} to subscriptions")
+                    return True
+                else:
+                    logger.error(f"Failed to save user {user_id} to subscriptions")
+                    return False
             else:
-                logger.error(f"Failed to save user {user_id} to subscriptions")
-                return False
-        else:
-            logger.info(f"User {user_id} is already subscribed")
-            return True  # Already subscribed, consider it success
+                logger.info(f"User {user_id} is already subscribed")
+                return True  # Already subscribed, consider it success
     except Exception as e:
         logger.error(f"Error adding user {user_id}: {e}")
         return False
 
+def ensure_user(user_id):
+    """Subscribe a user if they aren't already, in a single load/save cycle
+    
+    Returns:
+        (was_new, ok) - was_new is True if the user was not subscribed before,
+        ok is True if the user is subscribed after the call
+    """
+    try:
+        with _users_lock:
+            users = load_subscribed_users()
+            if user_id in users:
+                return False, True
+            users.append(user_id)
+            if save_subscribed_users(users):
+                logger.info(f"Successfully added user {user_id} to subscriptions")
+                return True, True
+            logger.error(f"Failed to save user {user_id} to subscriptions")
+            return True, False
+    except Exception as e:
+        logger.error(f"Error ensuring user {user_id} is subscribed: {e}")
+        return False, False
+
 def remove_user(user_id):
     """Remove a user from the subscription list"""
     try:
-        users = load_subscribed_users()
-        if user_id in users:
-            users.remove(user_id)
-            if save_subscribed_users(users):
-                logger.info(f"Successfully removed user {user_id} from subscriptions")
-                return True
+        with _users_lock:
+            users = load_subscribed_users()
+            if user_id in users:
+                users.remove(user_id)
+                if save_subscribed_users(users):
+                    logger.info(f"Successfully removed user {user_id} from subscriptions")
+                    return True
+                else:
+                    logger.error(f"Failed to save after removing user {user_id} from subscriptions")
+                    return False
             else:
-                logger.error(f"Failed to save after removing user {user_id} from subscriptions")
-                return False
-        else:
-            logger.info(f"User {user_id} is not subscribed")
-            return False  # Not subscribed, return False
+                logger.info(f"User {user_id} is not subscribed")
+                return False  # Not subscribed, return False
     except Exception as e:
         logger.error(f"Error removing user {user_id}: {e}")
         return False
 
+def remove_users(user_ids):
+    """Remove several users from the subscription list in a single load/save cycle
+    
+    Returns:
+        Number of users that were subscribed and have been removed
+    """
+    try:
+        with _users_lock:
+            users = load_subscribed_users()
+            to_remove = set(user_ids)
+            remaining = [user_id for user_id in users if user_id not in to_remove]
+            removed = len(users) - len(remaining)
+            if not removed:
+                return 0
+            if save_subscribed_users(remaining):
+                logger.info(f"Successfully removed {removed} users from subscriptions")
+                return removed
+            logger.error(f"Failed to save after removing {removed} users from subscriptions")
+            return 0
+    except Exception as e:
+        logger.error(f"Error removing users {list(user_ids)}: {e}")
+        return 0
+
 def is_subscribed(user_id):
     """Check if a user is subscribed"""
     users = load_subscribed_users()
     return user_id in users
 
+def get_subscribed_users_mtime():
+    """Modification time (ns) of the subscriptions file, or None if it doesn't exist yet"""
+    try:
+        return os.stat(STORAGE_FILE).st_mtime_ns
+    except OSError:
+        return None
+
 def get_all_subscribed_users():
     """Get all subscribed user IDs"""
     return load_subscribed_users()